@@ -0,0 +1,285 @@
+"""
+Telegram vakansiya parserining micro-benchmarki
+
+Eski (har xabarda substring sikllari va kompilyatsiya qilinmagan re.search)
+va yangi (oldindan kompilyatsiya qilingan automat) parserlarni bir xil
+korpusda solishtiradi: natijalar bir xilligini tekshiradi va messages/sec
+ni chiqaradi.
+
+Ishga tushirish:
+    python bench_telegram_parser.py [takrorlar_soni]
+"""
+
+import re
+import sys
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from telegram_scraper import TelegramVacancyScraper
+
+logging.disable(logging.CRITICAL)
+logger = logging.getLogger(__name__)
+
+# Kanallardan olingan postlar namunasi (kontaktlar olib tashlangan)
+CORPUS = [
+    """🔥 Python Developer (Middle)
+
+🏢 Kompaniya: Uzum Technologies
+📍 Toshkent, Chilonzor
+💰 Maosh: 15-25 mln so'm
+👨‍💻 Talablar:
+- Django, FastAPI
+- PostgreSQL, Redis
+- 2-3 года опыта
+
+📩 Rezyume: @hr_uzum""",
+    """Xodim kerak!
+
+Sotuvchi-konsultant qidiriladi. Ish vaqti 9:00 - 18:00.
+Oylik: 4 000 000 so'mdan
+Manzil: Samarqand shahri
+Murojaat uchun: +998 90 123 45 67""",
+    """#вакансия #frontend
+
+Требуется Frontend разработчик (React, TypeScript)
+Компания: Payme
+Город: Ташкент
+Зарплата: от 1500$
+Опыт: 3-5 лет
+Формат: офис / гибрид""",
+    """Senior Android Developer (Kotlin)
+
+We are hiring! Company: EPAM Uzbekistan
+Location: Tashkent, remote possible
+Salary: 3000-4500 USD
+Requirements: 6+ years, Jetpack Compose, Coroutines""",
+    """📢 AKSIYA! Faqat bugun 50% chegirma barcha kurslarga! Shoshiling, joylar soni cheklangan.""",
+    """Ustoz kerak
+
+Fan: Ingliz tili (IELTS 7+)
+Hudud: Farg'ona viloyati, Marg'ilon
+Ish haqi: kelishilgan holda
+Talab: tajriba 1-2 yil""",
+    """Junior QA Tester
+
+Компания: Click
+Без опыта, стажер тоже рассматриваем
+Зп: 5 млн
+Наманган""",
+    """Продаю iPhone 14 Pro, состояние идеальное, цена договорная. Писать в личку.""",
+    """UI/UX Designer kerak
+
+Firma: Artel Electronics
+Figma, Adobe XD bilan ishlash
+Maosh 8-12 mln
+Buxoro""",
+    """DevOps Engineer
+
+Kubernetes, Terraform, AWS. Team lead position, more than 6 years.
+Компания: Kapitalbank
+Зарплата до 40 млн
+Ташкент, Мирзо-Улугбек""",
+    """Bugun kanalimizga 10 000 obunachi bo'ldi! Rahmat hammaga, davom etamiz 🎉""",
+    """Call-markaz operatori kerak. Yoshi 18-30, rus va o'zbek tillarini bilishi shart.
+Oylik 3 500 000 + bonus. Andijon shahri. Tel: 99 123 45 67""",
+]
+
+
+class LegacyParser(TelegramVacancyScraper):
+    """Optimizatsiyadan oldingi implementatsiya (solishtirish uchun)"""
+    
+    def is_vacancy_message(self, text: str) -> bool:
+        """Xabar vakansiya ekanligini aniqlash"""
+        if not text or len(text) < 20:
+            return False
+        
+        text_lower = text.lower()
+        
+        # Exclude keywords (spam, reklama)
+        exclude_keywords = [
+            'купить', 'продать', 'продаю', 'куплю', 'sotish', 'sotaman',
+            'reklama', 'advertisement', 'акция', 'скидка', 'chegirma'
+        ]
+        
+        for exclude in exclude_keywords:
+            if exclude in text_lower:
+                return False
+        
+        # Trigger so'zlar bormi?
+        triggers_found = 0
+        for trigger in self.vacancy_triggers:
+            if trigger in text_lower:
+                triggers_found += 1
+                if triggers_found >= 2:  # Kamida 2 ta trigger
+                    return True
+        
+        return triggers_found >= 1  # Yoki 1 ta trigger + uzun matn
+    
+    def parse_vacancy_from_text(self, text: str, channel_name: str, message_id: int, date) -> Optional[Dict]:
+        """Xabar matnidan vakansiyani parse qilish"""
+        if not self.is_vacancy_message(text):
+            return None
+        
+        logger.debug(f"Parsing vacancy from {channel_name}/{message_id}")
+        
+        # Title topish (birinchi 2 qatordan)
+        lines = [l.strip() for l in text.split('\n') if l.strip()]
+        title = lines[0] if lines else 'Vakansiya'
+        
+        # Emoji va keraksiz belgilarni tozalash
+        title = re.sub(r'[#️⃣🔴🔵⚡️💼📌🔥✅❗️⭕️🟢🔴🟡⚪️💎🎯🚀📢🔔]', '', title).strip()
+        
+        # Title juda qisqa bo'lsa, ikkinchi qatorni ham qo'shish
+        if len(title) < 15 and len(lines) > 1:
+            second_line = re.sub(r'[#️⃣🔴🔵⚡️💼📌🔥✅❗️⭕️🟢🔴🟡⚪️💎🎯🚀📢🔔]', '', lines[1]).strip()
+            title = f"{title} {second_line}"
+        
+        title = title[:150]  # Max 150 belgi
+        
+        if not title or len(title) < 5:
+            title = 'Vakansiya'
+        
+        # Kompaniya topish
+        company = 'Noma\'lum'
+        company_patterns = [
+            r'(?:компания|company|firma|kompaniya|tashkilot)[:\s]+([^\n]{3,100})',
+            r'(?:в компании|at company|da)[:\s]+([^\n]{3,100})',
+            r'(?:фирма|firm)[:\s]+([^\n]{3,100})'
+        ]
+        
+        for pattern in company_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                company = match.group(1).strip()[:100]
+                company = re.sub(r'[#️⃣🔴🔵⚡️💼📌🔥✅❗️⭕️🟢🔴🟡⚪️💎🎯🚀📢🔔]', '', company).strip()
+                if company:
+                    break
+        
+        # Maosh topish
+        salary_min = None
+        salary_max = None
+        
+        salary_patterns = [
+            r'(\d+)\s*[-–—]\s*(\d+)\s*(?:млн|mln|million|миллион)?',
+            r'(?:от|dan|from)\s+(\d+)',
+            r'(?:до|gacha|to)\s+(\d+)',
+            r'(?:зп|maosh|salary)[:\s]+(\d+)',
+            r'(\d+)\s*(?:млн|mln)',
+            r'(?:зарплата|oylik)[:\s]+(\d+)',
+        ]
+        
+        for pattern in salary_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                try:
+                    nums = [int(n.replace(' ', '').replace(',', '')) for n in match.groups() if n]
+                    if len(nums) >= 2:
+                        # Agar kichik raqamlar bo'lsa (млн format)
+                        salary_min = nums[0] * 1000000 if nums[0] < 100 else nums[0]
+                        salary_max = nums[1] * 1000000 if nums[1] < 100 else nums[1]
+                    elif len(nums) == 1:
+                        salary_min = nums[0] * 1000000 if nums[0] < 100 else nums[0]
+                    break
+                except:
+                    pass
+        
+        # Joylashuv topish
+        location = 'Tashkent'
+        location_keywords = {
+            'ташкент': 'Tashkent', 'tashkent': 'Tashkent', 'toshkent': 'Tashkent',
+            'самарканд': 'Samarkand', 'samarkand': 'Samarkand', 'samarqand': 'Samarkand',
+            'бухара': 'Bukhara', 'bukhara': 'Bukhara', 'buxoro': 'Bukhara',
+            'андижан': 'Andijan', 'andijan': 'Andijan', 'andijon': 'Andijan',
+            'фергана': 'Fergana', 'fergana': 'Fergana', "farg'ona": 'Fergana',
+            'наманган': 'Namangan', 'namangan': 'Namangan',
+        }
+        
+        text_lower = text.lower()
+        for keyword, city in location_keywords.items():
+            if keyword in text_lower:
+                location = city
+                break
+        
+        # Tajriba
+        experience_level = 'not_specified'
+        exp_keywords = {
+            'no_experience': ['junior', 'джуниор', 'без опыта', 'tajribasiz', 'no experience', 'стажер', 'stajer'],
+            'between_1_and_3': ['middle', 'мидл', '1-3', '2-3 года', '1-2 yil'],
+            'between_3_and_6': ['3-6', '3-5 лет', '4-6 yil'],
+            'more_than_6': ['senior', 'сеньор', 'lead', 'тимлид', '6+', 'более 6']
+        }
+        
+        for level, keywords in exp_keywords.items():
+            if any(kw in text_lower for kw in keywords):
+                experience_level = level
+                break
+        
+        # URL
+        url = f"https://t.me/{channel_name.replace('@', '')}/{message_id}"
+        
+        # Date
+        if isinstance(date, datetime):
+            if date.tzinfo is None:
+                published_date = date.replace(tzinfo=timezone.utc)
+            else:
+                published_date = date.astimezone(timezone.utc)
+        else:
+            published_date = datetime.now(timezone.utc)
+        
+        # Tavsif (birinchi 500 belgi, emoji tozalangan)
+        description = text[:500]
+        
+        vacancy = {
+            'external_id': f"tg_{channel_name}_{message_id}",
+            'title': title,
+            'company': company,
+            'description': description,
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'location': location,
+            'experience_level': experience_level,
+            'url': url,
+            'source': 'telegram',
+            'published_date': published_date
+        }
+        
+        logger.info(f"✅ Telegram vakansiya: {title[:50]} from {channel_name}")
+        return vacancy
+
+
+def run(parser, corpus, repeats: int) -> float:
+    """messages/sec ni o'lchash"""
+    date = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for i, text in enumerate(corpus):
+            parser.parse_vacancy_from_text(text, '@bench', i, date)
+    elapsed = time.perf_counter() - started
+    return repeats * len(corpus) / elapsed
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    legacy = LegacyParser()
+    compiled = TelegramVacancyScraper()
+    
+    # Natijalar bir xilligini tekshirish
+    date = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i, text in enumerate(CORPUS):
+        old = legacy.parse_vacancy_from_text(text, '@bench', i, date)
+        new = compiled.parse_vacancy_from_text(text, '@bench', i, date)
+        assert old == new, f"Natija farq qiladi (post #{i}):\n{old}\n{new}"
+    
+    before = run(legacy, CORPUS, repeats)
+    after = run(compiled, CORPUS, repeats)
+    
+    print(f"Korpus: {len(CORPUS)} ta post x {repeats} takror")
+    print(f"Oldin:  {before:,.0f} msg/s")
+    print(f"Keyin:  {after:,.0f} msg/s")
+    print(f"Tezlanish: {after / before:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -145,26 +145,18 @@ async def auto_scrape_and_notify():
     logger.info("Avtomatik scraping boshlandi...")
     
     try:
-        # 1. Telegram scraping (Global)
-        telegram_vacancies = []
-        try:
-            from config import TELEGRAM_ENABLED
-            from telegram_scraper import telegram_scraper
-            from uzjobs_scraper import uz_jobs_scraper
-            
-            if TELEGRAM_ENABLED and telegram_scraper and telegram_scraper.is_available():
-                logger.info("📱 Telegram scraping boshlanmoqda...")
-                await telegram_scraper.connect()
-                telegram_vacancies = await telegram_scraper.scrape_channels(limit_per_channel=30)
-                await telegram_scraper.disconnect()
-                
-                # Bazaga saqlash
-                if telegram_vacancies:
-                    tg_save_tasks = [db.add_vacancy(**v) for v in telegram_vacancies]
-                    await asyncio.gather(*tg_save_tasks, return_exceptions=True)
-                    logger.info(f"✅ Telegram: {len(telegram_vacancies)} ta vakansiya saqlandi")
-        except Exception as e:
-            logger.error(f"❌ Telegram scraping error: {e}")
+        from datetime import datetime, timezone
+        from datetime import timedelta
+        from vacancy_sources import vacancy_sources, query_key, freshness_key
+        from config import HH_CRAWL_ENABLED, SEARCH_FRESHNESS_MINUTES
+        
+        # 1. Kalit so'zsiz manbalarni parallel crawl qilish (Telegram kanallari, hh.uz hududlari)
+        crawl_names = ['telegram'] + (['hh_uz'] if HH_CRAWL_ENABLED else [])
+        # Faqat saqlash - tarqatish siklning oxirida (deliver_pending_vacancies)
+        await vacancy_sources.crawl(crawl_names)
+        
+        # Eskirgan qidiruv freshness yozuvlari baribir "yangilash kerak" degani - o'chiramiz
+        await db.prune_search_freshness(timedelta(minutes=SEARCH_FRESHNESS_MINUTES))
 
         # 2. Barcha faol foydalanuvchilar va ularning filtrlarini olish
         active_users = await db.get_all_active_users()
@@ -183,10 +175,10 @@ async def auto_scrape_and_notify():
                 user_filter = await db.get_user_filter(user_id)
                 if user_filter and user_filter.get('keywords'):
                     keywords = tuple(sorted(user_filter.get('keywords', [])))
-                    locations = user_filter.get('locations', ['Tashkent'])
-                    location = locations[0] if locations else 'Tashkent'
+                    # Guruh kaliti userning barcha hududlari bo'yicha
+                    locations = tuple(sorted(set(user_filter.get('locations') or ['Tashkent'])))
                     
-                    group_key = (keywords, location)
+                    group_key = (keywords, locations)
                     if group_key not in search_groups:
                         search_groups[group_key] = []
                     search_groups[group_key].append(user_id)
@@ -197,63 +189,84 @@ async def auto_scrape_and_notify():
         # 3. Unique keywords for UzJobs (reduction of 429s)
         unique_keywords = set()
         for group_key in search_groups.keys():
-            unique_keywords.add(group_key[0]) # group_key is (keywords_tuple, location)
+            unique_keywords.add(group_key[0]) # group_key is (keywords_tuple, locations_tuple)
 
         logger.info(f"Unique UzJobs keyword sets: {len(unique_keywords)}")
         
-        # 4. Global UzJobs results cache for this run
-        uzjobs_results_cache = {}
+        # 4. UzJobs natijalari (scraper keshi user qidiruvi bilan umumiy - takroriy so'rovlar yo'q)
+        from config import UZJOBS_BACKGROUND_DEADLINE
+        from uzjobs_scraper import uz_jobs_scraper
         for kw_tuple in unique_keywords:
             try:
                 kw_list = list(kw_tuple)
                 logger.info(f"UzJobs scraping for keywords: {kw_list}")
-                uzjobs_list = await uz_jobs_scraper.scrape_uzjobs(keywords=kw_list)
+                misses_before = uz_jobs_scraper.cache_stats['misses']
+                results = await vacancy_sources.search(
+                    {'keywords': kw_list, 'interactive': False}, ['uzjobs'], UZJOBS_BACKGROUND_DEADLINE
+                )
+                uzjobs_list = results[0]['vacancies'] if results else []
                 if uzjobs_list:
-                    uzjobs_results_cache[kw_tuple] = uzjobs_list
-                    # Save to DB immediately
-                    uz_save_tasks = [db.add_vacancy(**v) for v in uzjobs_list]
-                    await asyncio.gather(*uz_save_tasks, return_exceptions=True)
-                await asyncio.sleep(2) # Extra delay between unique keyword searches
+                    # Faqat saqlash - tarqatish siklning oxirida (deliver_pending_vacancies)
+                    await db.ingest_vacancies(uzjobs_list)
+                if uz_jobs_scraper.cache_stats['misses'] != misses_before:
+                    await asyncio.sleep(2) # Extra delay between unique keyword searches
             except Exception as e:
                 logger.error(f"UzJobs global scrape error ({kw_tuple}): {e}")
 
-        # 5. Process each group for hh.uz and distribution
-        hh_semaphore = asyncio.Semaphore(5)
-        
-        async def process_group(keywords_tuple, location, user_ids):
-            async with hh_semaphore:
-                try:
-                    keywords = list(keywords_tuple)
-                    # hh.uz scraping
-                    vacancies_list = await scraper_api.scrape_hh_uz(
-                        keywords=keywords, 
-                        location=location,
-                        pages=1
-                    )
-                    
-                    # hh.uz vakansiyalarini saqlash
-                    if vacancies_list:
-                        save_tasks = [db.add_vacancy(**v) for v in vacancies_list]
-                        await asyncio.gather(*save_tasks, return_exceptions=True)
-                    
-                    # Get UzJobs results from cache
-                    cached_uzjobs = uzjobs_results_cache.get(keywords_tuple, [])
-                    
-                    # Umumiy ro'yxat: hh.uz + Telegram + UzJobs
-                    combined_vacancies = (vacancies_list or []) + cached_uzjobs + telegram_vacancies
-                    
-                    if combined_vacancies:
-                        await distribute_vacancies_to_group(user_ids, combined_vacancies)
+        # 5. hh.uz: hududiy delta crawler (1-qadamda saqlandi) yoki guruhlar bo'yicha qidiruv
+        if not HH_CRAWL_ENABLED:
+            # hh.uz so'rovlarini rejalashtirish: o'xshash guruhlar bitta OR so'rovga
+            from config import HH_QUERY_MAX_LENGTH, HH_PLAN_MAX_PAGES
+            plans = scraper_api.plan_group_queries(
+                list(search_groups.keys()), max_query_length=HH_QUERY_MAX_LENGTH,
+                # Har bir bo'lakka kamida bitta sahifa tegishi uchun
+                max_clauses=HH_PLAN_MAX_PAGES
+            )
+            if plans:
+                logger.info(
+                    f"hh.uz query planner: {len(search_groups)} guruh -> {len(plans)} so'rov "
+                    f"(siqish: {len(search_groups) / len(plans):.1f}x)"
+                )
+            
+            hh_semaphore = asyncio.Semaphore(5)
+            
+            async def process_plan(plan):
+                async with hh_semaphore:
+                    try:
+                        # hh.uz scraping (bo'laklar soniga qarab ko'proq sahifa)
+                        results = await vacancy_sources.search(
+                            {
+                                'locations': plan['locations'],
+                                'pages': min(plan['clauses'], HH_PLAN_MAX_PAGES),
+                                'text': plan['query'],
+                                'interactive': False,
+                            },
+                            ['hh_uz'],
+                            SCRAPING_INTERVAL
+                        )
+                        vacancies_list = results[0]['vacancies'] if results else []
                         
-                except Exception as e:
-                    logger.error(f"Guruh scraping xatolik ({keywords}): {e}")
-
-        logger.info(f"Guruhlarni parallel saralash boshlandi ({len(search_groups)} guruh)...")
-        tasks = [
-            process_group(k, l, u) 
-            for (k, l), u in search_groups.items()
-        ]
-        await asyncio.gather(*tasks)
+                        # Faqat saqlash - tarqatish siklning oxirida (deliver_pending_vacancies)
+                        if vacancies_list:
+                            await db.ingest_vacancies(vacancies_list)
+                        
+                        # Guruhlar qidiruvi bazada yangi - user qidiruvi DB-first javob oladi
+                        if results and results[0]['status'] in ('ok', 'empty'):
+                            refreshed_at = datetime.now(timezone.utc)
+                            for keywords_tuple, locations_tuple in plan['groups']:
+                                await db.save_crawl_watermark(
+                                    'search', freshness_key('hh_uz', query_key(keywords_tuple, locations_tuple)),
+                                    refreshed_at
+                                )
+                    except Exception as e:
+                        logger.error(f"Guruh scraping xatolik ({plan['query'][:100]}): {e}")
+            
+            logger.info(f"So'rovlarni parallel bajarish boshlandi ({len(plans)} so'rov)...")
+            await asyncio.gather(*[process_plan(plan) for plan in plans])
+        
+        # 6. Tarqatish - shu siklda (yoki user qidiruvi, fon yangilash orqali) saqlangan,
+        # hali tarqatilmagan barcha vakansiyalar har bir guruhga
+        await deliver_pending_vacancies(search_groups)
                 
         logger.info("Avtomatik scraping tugadi")
         
@@ -261,9 +274,55 @@ async def auto_scrape_and_notify():
         logger.error(f"Avtomatik scraping xatolik: {e}", exc_info=True)
 
 
-async def distribute_vacancies_to_group(user_ids: list, vacancies: list):
-    """Vakansiyalarni userlarga tarqatish"""
+# Fon siklida alert qilinadigan manbalar (user_post - e'lon joylanganda alohida)
+ALERT_SOURCES = ['hh_uz', 'uzjobs', 'telegram']
+
+
+async def deliver_pending_vacancies(search_groups: dict):
+    """Tarqatilmagan vakansiyalarni guruhlarga yuborish va tarqatildi deb belgilash
+
+    Yangilik ingest natijasidan emas, vakansiyaning `matched_at` holatidan olinadi:
+    uni qaysi yo'l birinchi saqlagani ahamiyatsiz. Belgilash faqat barcha guruhlar
+    muvaffaqiyatli o'tgach - yiqilgan sikl keyingi safar qayta tarqatadi
+    (takrorlanish sent_alerts anti-join bilan oldi olinadi).
+    """
+    from datetime import datetime, timedelta, timezone
+    from config import ALERT_WINDOW_HOURS, ALERT_BATCH_LIMIT
+    
+    window_start = datetime.now(timezone.utc) - timedelta(hours=ALERT_WINDOW_HOURS)
+    await db.expire_undelivered_vacancies(window_start)
+    
+    pending = await db.get_undelivered_vacancies(ALERT_SOURCES, window_start, ALERT_BATCH_LIMIT)
+    if not pending:
+        return
+    logger.info(f"Tarqatish: {len(pending)} ta yangi / o'zgargan vakansiya, {len(search_groups)} guruh")
+    
+    failed = False
+    for (keywords_tuple, _), user_ids in search_groups.items():
+        try:
+            await distribute_vacancies_to_group(user_ids, pending)
+        except Exception as e:
+            failed = True
+            logger.error(f"Guruh tarqatish xatolik ({keywords_tuple}): {e}")
+    
+    if not failed:
+        await db.mark_vacancies_matched(pending)
+
+
+async def distribute_vacancies_to_group(user_ids: list, vacancies: list, per_user_limit: int = 3):
+    """Vakansiyalarni userlarga tarqatish
+
+    Yuborilganlik tekshiruvi va belgilash butun guruh uchun bittadan so'rov:
+    avval har bir user uchun mos keladigan barcha vakansiyalar yig'iladi,
+    keyin bitta anti-join bilan yuborilmaganlari olinadi va har bir userga
+    birinchi `per_user_limit` tasi yuboriladi.
+    """
     from filters import vacancy_filter
+    from utils.i18n import get_user_lang, get_text
+    
+    candidates = []  # (user_id, vacancy_id)
+    by_key = {}      # (user_id, vacancy_id) -> vacancy
+    langs = {}
     
     for user_id in user_ids:
         try:
@@ -273,8 +332,7 @@ async def distribute_vacancies_to_group(user_ids: list, vacancies: list):
                 continue
             
             # Tilni olish
-            from utils.i18n import get_user_lang
-            lang = await get_user_lang(user_id)
+            langs[user_id] = await get_user_lang(user_id)
             
             # Premium tekshirish
             is_premium = await db.is_premium(user_id)
@@ -291,25 +349,41 @@ async def distribute_vacancies_to_group(user_ids: list, vacancies: list):
                     sources = [s for s in sources if s != 'telegram']
                     user_filter['sources'] = sources
                 
-            # Filtr qo'llash
-            filtered_vacancies = vacancy_filter.apply_filters(vacancies, user_filter)
-            
-            created_count = 0
-            for vacancy in filtered_vacancies[:3]:
+            # Filtr qo'llash (kesishsiz - yuborilganlar keyin chiqarib tashlanadi)
+            for vacancy in vacancy_filter.apply_filters(vacancies, user_filter):
                 vacancy_id = vacancy.get('external_id') or vacancy.get('id')
-                
-                # Allaqachon yuborilganmi?
-                is_sent = await db.is_vacancy_sent(user_id, str(vacancy_id))
-                if is_sent:
+                if not vacancy_id:
                     continue
-                
+                key = (user_id, str(vacancy_id))
+                if key not in by_key:
+                    by_key[key] = vacancy
+                    candidates.append(key)
+            
+        except Exception as e:
+            logger.error(f"User dist error {user_id}: {e}")
+    
+    if not candidates:
+        return
+    
+    # Bitta so'rov - hali yuborilmagan juftliklar (tartib saqlanadi)
+    unsent = await db.filter_unsent_pairs(candidates)
+    
+    per_user = {}
+    for user_id, vacancy_id in unsent:
+        picked = per_user.setdefault(user_id, [])
+        if len(picked) < per_user_limit:
+            picked.append(vacancy_id)
+    
+    sent_pairs = []
+    try:
+        for user_id, vacancy_ids in per_user.items():
+            lang = langs[user_id]
+            alert_title = await get_text("vac_alert_new", lang=lang)
+            
+            for vacancy_id in vacancy_ids:
                 # Yuborish
                 try:
-                    vacancy_text = vacancy_filter.format_vacancy_message(vacancy, lang=lang)
-                    
-                    # Alert sarlavhasi
-                    from utils.i18n import get_text
-                    alert_title = await get_text("vac_alert_new", lang=lang)
+                    vacancy_text = vacancy_filter.format_vacancy_message(by_key[(user_id, vacancy_id)], lang=lang)
                     
                     await bot.send_message(
                         chat_id=user_id,
@@ -318,17 +392,105 @@ async def distribute_vacancies_to_group(user_ids: list, vacancies: list):
                         disable_web_page_preview=True
                     )
                     
-                    if vacancy_id:
-                        await db.mark_vacancy_sent(user_id, str(vacancy_id))
-                    
-                    created_count += 1
+                    sent_pairs.append((user_id, vacancy_id))
                     await asyncio.sleep(0.3) # User rate limit
                     
                 except Exception as e:
                     logger.debug(f"Send error {user_id}: {e}")
-            
-        except Exception as e:
-            logger.error(f"User dist error {user_id}: {e}")
+    finally:
+        # Bitta so'rov - yuborilganlarni belgilash (bekor qilinsa ham yuborilganlari yoziladi)
+        await db.mark_sent_bulk(sent_pairs)
+
+
+# Telegram streaming rejimida kelgan vakansiyalar buferi
+telegram_stream_buffer = []
+# Saqlanmagan vakansiya -> urinishlar soni (cheksiz qayta urinmaslik uchun)
+telegram_stream_retries = {}
+TELEGRAM_STREAM_MAX_RETRIES = 3
+
+
+async def on_telegram_vacancy(vacancy: dict):
+    """Streaming orqali kelgan vakansiyani buferga qo'shish"""
+    telegram_stream_buffer.append(vacancy)
+
+
+def requeue_telegram_stream(vacancies: list):
+    """Saqlanmagan vakansiyalarni keyingi flush uchun buferga qaytarish"""
+    for vacancy in vacancies:
+        key = vacancy.get('external_id')
+        attempts = telegram_stream_retries.get(key, 0) + 1
+        if attempts >= TELEGRAM_STREAM_MAX_RETRIES:
+            telegram_stream_retries.pop(key, None)
+            logger.error(f"❌ Telegram stream: {key} {attempts} marta saqlanmadi, tashlab yuborildi")
+            continue
+        telegram_stream_retries[key] = attempts
+        telegram_stream_buffer.append(vacancy)
+
+
+async def flush_telegram_stream():
+    """Buferdagi Telegram vakansiyalarini saqlash va mos userlarga yuborish"""
+    if not telegram_stream_buffer:
+        return
+    
+    batch = telegram_stream_buffer[:]
+    telegram_stream_buffer.clear()
+    
+    try:
+        # Faqat yangi va o'zgargan (tahrirlangan) xabarlarni tarqatamiz
+        ingested = await db.ingest_vacancies(batch)
+    except Exception as e:
+        logger.error(f"❌ Telegram stream saqlash xatolik: {e}")
+        requeue_telegram_stream(batch)
+        return
+    
+    failed = ingested['failed']
+    stored = ingested['new'] + ingested['changed'] + ingested['unchanged']
+    for vacancy in stored:
+        telegram_stream_retries.pop(vacancy.get('external_id'), None)
+    requeue_telegram_stream(failed)
+    
+    try:
+        # Kanal watermarklari faqat polling (TelegramSource.crawl) da siljiydi - stream
+        # ko'rmagan xabarlar (restart / uzilish oralig'i) polling orqali baribir o'qiladi
+        new_vacancies = ingested['new'] + ingested['changed']
+        logger.info(
+            f"📡 Telegram stream: {len(batch)} ta keldi, {len(new_vacancies)} ta yangi, "
+            f"{len(failed)} ta saqlanmadi"
+        )
+        
+        # Tezkor yetkazish; matched_at ga tegilmaydi - sikl (deliver_pending_vacancies)
+        # ularni qayta tekshiradi, yuborilganlari sent_alerts orqali chiqarib tashlanadi
+        if new_vacancies:
+            user_ids = await db.get_active_users_with_keywords()
+            await distribute_vacancies_to_group(user_ids, new_vacancies)
+    except Exception as e:
+        logger.error(f"❌ Telegram stream flush xatolik: {e}")
+
+
+async def start_telegram_streaming():
+    """Telegram kanallariga NewMessage obunasini yoqish"""
+    from config import TELEGRAM_ENABLED, TELEGRAM_STREAMING_ENABLED, TELEGRAM_STREAM_FLUSH_INTERVAL
+    if not (TELEGRAM_ENABLED and TELEGRAM_STREAMING_ENABLED):
+        return
+    
+    try:
+        from telegram_scraper import telegram_scraper
+        if not telegram_scraper or not telegram_scraper.is_available():
+            return
+        
+        await telegram_scraper.ensure_connected()
+        if await telegram_scraper.start_streaming(on_telegram_vacancy):
+            scheduler.add_job(
+                flush_telegram_stream,
+                'interval',
+                seconds=TELEGRAM_STREAM_FLUSH_INTERVAL,
+                id='telegram_stream_flush',
+                max_instances=1,
+                coalesce=True
+            )
+            logger.info(f"   ✅ Telegram streaming (flush: {TELEGRAM_STREAM_FLUSH_INTERVAL}s)")
+    except Exception as e:
+        logger.error(f"   ⚠️ Telegram streaming yoqilmadi: {e}")
 
 
 async def on_startup():
@@ -370,6 +532,9 @@ async def on_startup():
     scheduler.start()
     logger.info(f"   ✅ Scheduler ishga tushdi (interval: {SCRAPING_INTERVAL}s)")
     
+    # Telegram push rejimi (polling esa uzilishlar uchun zaxira bo'lib qoladi)
+    await start_telegram_streaming()
+    
     # Dastlabki scrapingni scheduler o'zi hal qiladi
     
     # Funksiyalar ro'yxati
@@ -414,16 +579,42 @@ async def on_shutdown():
     except Exception as e:
         logger.error(f"   ⚠️ Scheduler xatolik: {e}")
 
-    # 2. Bot session yopish
-    logger.info("2. Bot session yopish...")
+    # 2. Telegram scraper clientini yopish
+    try:
+        from telegram_scraper import telegram_scraper
+        if telegram_scraper and telegram_scraper.client:
+            logger.info("2. Telegram scraper uzilish...")
+            telegram_scraper.stop_streaming()
+            await flush_telegram_stream()
+            await telegram_scraper.disconnect()
+            logger.info("   ✅ Telegram scraper uzildi")
+    except Exception as e:
+        logger.error(f"   ⚠️ Telegram scraper xatolik: {e}")
+
+    # Parsing poolni yopish
+    try:
+        from utils.parsing import shutdown_parse_pool
+        shutdown_parse_pool()
+    except Exception as e:
+        logger.error(f"   ⚠️ Parsing pool xatolik: {e}")
+
+    # Umumiy HTTP pool (hh.uz, UzJobs, Grok)
+    try:
+        from utils.http_client import http_client
+        await http_client.close()
+    except Exception as e:
+        logger.error(f"   ⚠️ HTTP pool xatolik: {e}")
+
+    # 3. Bot session yopish
+    logger.info("3. Bot session yopish...")
     try:
         await bot.session.close()
         logger.info("   ✅ Bot session yopildi")
     except Exception as e:
         logger.error(f"   ⚠️ Bot session xatolik: {e}")
     
-    # 3. Database dan uzilish (Eng oxirida)
-    logger.info("3. Database dan uzilish...")
+    # 4. Database dan uzilish (Eng oxirida)
+    logger.info("4. Database dan uzilish...")
     if db.pool:
         await asyncio.sleep(0.5) 
         await db.disconnect()
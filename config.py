@@ -30,6 +30,48 @@ DEFAULT_TIMEZONE = timezone.utc  # UTC timezone
 # Scraping sozlamalari
 SCRAPING_INTERVAL = int(os.getenv('SCRAPING_INTERVAL', 600))  # 10 daqiqa
 
+# Alert tarqatish: sikl davomida saqlangan, hali tarqatilmagan vakansiyalar
+ALERT_WINDOW_HOURS = int(os.getenv('ALERT_WINDOW_HOURS', 72))  # Shundan eski e'lonlar alert qilinmaydi
+ALERT_BATCH_LIMIT = int(os.getenv('ALERT_BATCH_LIMIT', 5000))  # Bitta siklda max vakansiya
+
+# hh.uz query planner: guruhlarni OR bilan birlashtirish
+HH_QUERY_MAX_LENGTH = int(os.getenv('HH_QUERY_MAX_LENGTH', 400))  # Bitta so'rov matni uzunligi
+HH_PLAN_MAX_PAGES = int(os.getenv('HH_PLAN_MAX_PAGES', 5))  # Birlashtirilgan so'rov uchun max sahifa
+
+# hh.uz hududiy delta crawler (kalit so'zsiz, date_from watermark bo'yicha)
+HH_CRAWL_ENABLED = os.getenv('HH_CRAWL_ENABLED', 'False').lower() == 'true'
+HH_CRAWL_BACKFILL_HOURS = int(os.getenv('HH_CRAWL_BACKFILL_HOURS', 24))  # Birinchi crawl chuqurligi
+HH_CRAWL_OVERLAP_MINUTES = int(os.getenv('HH_CRAWL_OVERLAP_MINUTES', 10))  # Kechikib indekslanganlar uchun
+
+# User qidiruvi: barcha manbalar uchun umumiy muddat (har bir manbaning o'z timeouti ham bor)
+SEARCH_DEADLINE = float(os.getenv('SEARCH_DEADLINE', 20.0))
+
+# DB-first qidiruv: avval bazadan javob, eskirgan bo'lsa manbalar fonda yangilanadi
+SEARCH_DB_FIRST = os.getenv('SEARCH_DB_FIRST', 'True').lower() == 'true'
+SEARCH_FRESHNESS_MINUTES = int(os.getenv('SEARCH_FRESHNESS_MINUTES', 30))  # Shundan eski - fonda yangilash
+SEARCH_LOCAL_DAYS = int(os.getenv('SEARCH_LOCAL_DAYS', 14))  # Bazadan qidirish oynasi
+
+# Umumiy HTTP connection pool (hh.uz, UzJobs, Grok)
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', 100))  # Jami ulanishlar
+HTTP_LIMIT_PER_HOST = int(os.getenv('HTTP_LIMIT_PER_HOST', 10))  # Bitta host uchun ulanishlar
+HTTP_DNS_TTL = int(os.getenv('HTTP_DNS_TTL', 300))  # DNS kesh (soniya)
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', 30))  # Bo'sh ulanishni saqlash (soniya)
+
+# Yuborilgan alertlar keshi (user bo'yicha Bloom filter, shubhali holatda - bazadan tekshirish)
+SENT_CACHE_MAX_USERS = int(os.getenv('SENT_CACHE_MAX_USERS', 5000))  # Xotirada saqlanadigan userlar
+SENT_CACHE_ERROR_RATE = float(os.getenv('SENT_CACHE_ERROR_RATE', 0.01))  # False positive ulushi
+
+# Ishga tushishda hot querylar EXPLAIN rejasini tekshirish (indekslar ishlatilayaptimi)
+DB_EXPLAIN_CHECK = os.getenv('DB_EXPLAIN_CHECK', 'False').lower() == 'true'
+
+# UzJobs: circuit breaker va kutish muddatlari (soniya)
+UZJOBS_BREAKER_THRESHOLD = int(os.getenv('UZJOBS_BREAKER_THRESHOLD', 3))  # Ketma-ket xatoliklar soni
+UZJOBS_BREAKER_COOLDOWN = int(os.getenv('UZJOBS_BREAKER_COOLDOWN', 300))  # Ochiq holat davomiyligi
+UZJOBS_INTERACTIVE_DEADLINE = float(os.getenv('UZJOBS_INTERACTIVE_DEADLINE', 2.0))  # User qidiruvi
+UZJOBS_BACKGROUND_DEADLINE = float(os.getenv('UZJOBS_BACKGROUND_DEADLINE', 180.0))  # Fon scraping
+UZJOBS_CACHE_TTL = int(os.getenv('UZJOBS_CACHE_TTL', 600))  # Natija yangi hisoblanadi
+UZJOBS_CACHE_STALE_TTL = int(os.getenv('UZJOBS_CACHE_STALE_TTL', 3600))  # Eskirgan natija ham beriladi (fonda yangilanadi)
+
 # Admin foydalanuvchilar
 ADMIN_IDS = [int(x) for x in os.getenv('ADMIN_IDS', '').split(',') if x]
 
@@ -38,6 +80,11 @@ TELEGRAM_API_ID = os.getenv('TELEGRAM_API_ID')
 TELEGRAM_API_HASH = os.getenv('TELEGRAM_API_HASH')
 TELEGRAM_PHONE = os.getenv('TELEGRAM_PHONE')
 TELEGRAM_ENABLED = bool(TELEGRAM_API_ID and TELEGRAM_API_HASH and TELEGRAM_PHONE)
+TELEGRAM_BACKFILL_LIMIT = int(os.getenv('TELEGRAM_BACKFILL_LIMIT', 30))  # Yangi kanal uchun oxirgi N ta xabar
+TELEGRAM_MAX_NEW_PER_CHANNEL = int(os.getenv('TELEGRAM_MAX_NEW_PER_CHANNEL', 200))  # Bir siklda watermarkdan keyingi max xabar
+TELEGRAM_SCRAPE_CONCURRENCY = int(os.getenv('TELEGRAM_SCRAPE_CONCURRENCY', 5))  # Bir vaqtda scraping qilinadigan kanallar
+TELEGRAM_STREAMING_ENABLED = os.getenv('TELEGRAM_STREAMING_ENABLED', 'True').lower() == 'true'  # events.NewMessage push rejimi
+TELEGRAM_STREAM_FLUSH_INTERVAL = int(os.getenv('TELEGRAM_STREAM_FLUSH_INTERVAL', 15))  # soniya
 
 # Vakansiya saytlari
 VACANCY_SITES = {
@@ -160,6 +207,10 @@ REQUEST_TIMEOUT = 30  # soniya
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # soniya
 
+# Parsing sozlamalari (BeautifulSoup / regex parse event loopdan tashqarida)
+PARSE_EXECUTOR = os.getenv('PARSE_EXECUTOR', 'process').lower()  # process | thread | inline
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', 2))  # 0 - inline parse
+
 # Cache sozlamalari
 CACHE_ENABLED = True
 CACHE_TTL = 3600  # 1 soat
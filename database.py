@@ -1,7 +1,8 @@
 import asyncpg
+import hashlib
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set, Tuple
 import asyncio
 
 logger = logging.getLogger(__name__)
@@ -49,55 +50,13 @@ class Database:
             logger.info("Database pool yopildi")
     
     async def create_tables(self):
-        """Jadvallarni yaratish"""
-        async with self.pool.acquire() as conn:
-            # Users jadvali
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id BIGINT PRIMARY KEY,
-                    username VARCHAR(255),
-                    first_name VARCHAR(255),
-                    last_name VARCHAR(255),
-                    language VARCHAR(5) DEFAULT 'uz',
-                    is_active BOOLEAN DEFAULT TRUE,
-                    premium_until TIMESTAMPTZ,
-                    referred_by BIGINT,
-                    role VARCHAR(50) DEFAULT 'seeker',
-                    created_at TIMESTAMPTZ DEFAULT NOW(),
-                    updated_at TIMESTAMPTZ DEFAULT NOW()
-                )
-            ''')
-            
-            # Migration: Add language column if not exists
-            try:
-                await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS language VARCHAR(5) DEFAULT 'uz'")
-            except:
-                pass
-
-            # Migration: Add role column if not exists
-            try:
-                await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS role VARCHAR(50) DEFAULT 'seeker'")
-            except Exception as e:
-                logger.error(f"Migration error (role column): {e}")
-
-            # Resumes jadvali
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS resumes (
-                    id SERIAL PRIMARY KEY,
-                    user_id BIGINT REFERENCES users(user_id),
-                    full_name VARCHAR(255),
-                    age INTEGER,
-                    technology TEXT,
-                    telegram_username VARCHAR(255),
-                    phone VARCHAR(50),
-                    region VARCHAR(255),
-                    salary VARCHAR(255),
-                    profession VARCHAR(255),
-                    call_time VARCHAR(255),
-                    goal TEXT,
-                    created_at TIMESTAMPTZ DEFAULT NOW()
-                )
-            ''')
+        """Jadvallarni yaratish - versiyalangan migratsiyalar (migrations.py)"""
+        from config import DB_EXPLAIN_CHECK
+        from migrations import run_migrations, check_query_plans
+        
+        await run_migrations(self.pool)
+        if DB_EXPLAIN_CHECK:
+            await check_query_plans(self.pool)
 
     async def add_user(self, user_id: int, username: str = None, 
                       first_name: str = None, last_name: str = None, language: str = 'uz'):
@@ -248,6 +207,23 @@ class Database:
             logger.error(f"❌ get_all_active_users xatolik: {e}")
             return []
     
+    async def get_active_users_with_keywords(self) -> List[int]:
+        """Kalit so'zlari o'rnatilgan faol foydalanuvchilar"""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT u.user_id
+                    FROM users u
+                    JOIN user_filters f ON f.user_id = u.user_id
+                    WHERE u.is_active = TRUE
+                      AND COALESCE(array_length(f.keywords, 1), 0) > 0
+                    ORDER BY u.user_id
+                ''')
+                return [row['user_id'] for row in rows]
+        except Exception as e:
+            logger.error(f"❌ get_active_users_with_keywords xatolik: {e}")
+            return []
+    
     # ========== PREMIUM MANAGEMENT - FIXED ==========
     
     async def set_premium(self, user_id: int, days: int) -> bool:
@@ -453,8 +429,8 @@ class Database:
                 result = await conn.fetchval('''
                     INSERT INTO vacancies 
                     (vacancy_id, title, company, location, salary_min, salary_max,
-                     experience_level, description, url, source, published_date, created_at)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                     experience_level, description, url, source, published_date, created_at, content_hash)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
                     ON CONFLICT (vacancy_id) DO NOTHING
                     RETURNING id
                 ''',
@@ -469,13 +445,195 @@ class Database:
                 kwargs.get('url'),
                 kwargs.get('source', 'hh_uz'),
                 kwargs.get('published_date', now),
-                now)
+                now,
+                self.vacancy_content_hash(kwargs))
                 
                 return result
                 
         except Exception as e:
             logger.debug(f"add_vacancy: {e}")
-            return None
+            return False
+
+    @staticmethod
+    def vacancy_content_hash(vacancy: Dict) -> str:
+        """Vakansiya mazmuni hashi (o'zgarishni aniqlash uchun; sana kirmaydi)"""
+        parts = [
+            vacancy.get('title'), vacancy.get('company'), vacancy.get('location'),
+            vacancy.get('salary_min'), vacancy.get('salary_max'), vacancy.get('experience_level'),
+            vacancy.get('description'), vacancy.get('url'),
+        ]
+        payload = '\x1f'.join('' if p is None else str(p) for p in parts)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    async def ingest_vacancies(self, vacancies: List[Dict], chunk_size: int = 2000) -> Dict[str, List[Dict]]:
+        """Vakansiyalarni bitta so'rov bilan saqlash va new / changed / unchanged ga ajratish
+
+        Har bir bo'lak (chunk) - bitta round trip (INSERT ... SELECT FROM unnest).
+        O'zgargan vakansiyalar joyida yangilanadi; hashi hali yo'q eski yozuvlar
+        faqat hash oladi va `unchanged` hisoblanadi. Saqlab bo'lmaganlari - `failed`
+        (chaqiruvchi ular uchun watermarkni siljitmasligi kerak).
+        """
+        now = datetime.now(timezone.utc)
+        result = {'new': [], 'changed': [], 'unchanged': [], 'failed': []}
+        
+        def to_int(value):
+            try:
+                return int(value) if value is not None else None
+            except (TypeError, ValueError):
+                return None
+        
+        # Bitta batch ichidagi takrorlarni olib tashlash (birinchisi qoladi)
+        unique = {}
+        for v in vacancies:
+            external_id = v.get('external_id')
+            if external_id and str(external_id) not in unique:
+                unique[str(external_id)] = v
+        items = list(unique.items())
+        
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            columns = (
+                [external_id for external_id, _ in chunk],
+                [v.get('title') for _, v in chunk],
+                [v.get('company') for _, v in chunk],
+                [v.get('location') for _, v in chunk],
+                [to_int(v.get('salary_min')) for _, v in chunk],
+                [to_int(v.get('salary_max')) for _, v in chunk],
+                [v.get('experience_level') for _, v in chunk],
+                [v.get('description') for _, v in chunk],
+                [v.get('url') for _, v in chunk],
+                [v.get('source', 'hh_uz') for _, v in chunk],
+                [v.get('published_date') or now for _, v in chunk],
+                [self.vacancy_content_hash(v) for _, v in chunk],
+            )
+            try:
+                async with self.pool.acquire() as conn:
+                    # CTE lar bitta snapshotni ko'radi - `old` da yangilanishdan oldingi hash
+                    rows = await conn.fetch('''
+                        WITH old AS (
+                            SELECT vacancy_id, content_hash FROM vacancies WHERE vacancy_id = ANY($1::text[])
+                        ), up AS (
+                            INSERT INTO vacancies 
+                            (vacancy_id, title, company, location, salary_min, salary_max,
+                             experience_level, description, url, source, published_date,
+                             content_hash, created_at, updated_at)
+                            SELECT t.*, $13::timestamptz, $13::timestamptz FROM unnest(
+                                $1::text[], $2::text[], $3::text[], $4::text[], $5::bigint[], $6::bigint[],
+                                $7::text[], $8::text[], $9::text[], $10::text[], $11::timestamptz[], $12::text[]
+                            ) AS t
+                            ON CONFLICT (vacancy_id) DO UPDATE
+                            SET title = EXCLUDED.title,
+                                company = EXCLUDED.company,
+                                location = EXCLUDED.location,
+                                salary_min = EXCLUDED.salary_min,
+                                salary_max = EXCLUDED.salary_max,
+                                experience_level = EXCLUDED.experience_level,
+                                description = EXCLUDED.description,
+                                url = EXCLUDED.url,
+                                content_hash = EXCLUDED.content_hash,
+                                -- Eski yozuvga faqat hash qo'shilishi o'zgarish emas (qayta yuborilmaydi)
+                                updated_at = CASE WHEN vacancies.content_hash IS NULL
+                                                  THEN vacancies.updated_at ELSE EXCLUDED.updated_at END
+                            WHERE vacancies.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                            RETURNING vacancy_id, (xmax = 0) AS inserted
+                        )
+                        SELECT up.vacancy_id, up.inserted, old.content_hash AS old_hash
+                        FROM up LEFT JOIN old USING (vacancy_id)
+                    ''', *columns, now)
+                
+                status = {}
+                for row in rows:
+                    if row['inserted']:
+                        status[row['vacancy_id']] = 'new'
+                    elif row['old_hash'] is not None:
+                        status[row['vacancy_id']] = 'changed'
+                for external_id, v in chunk:
+                    result[status.get(external_id, 'unchanged')].append(v)
+            except Exception as e:
+                # Buzilgan element butun bo'lakni yo'qotmasligi uchun - bittalab qo'shish
+                logger.error(f"❌ ingest_vacancies xatolik, bittalab qo'shiladi: {e}")
+                for external_id, v in chunk:
+                    added = await self.add_vacancy(**v)
+                    if added is False:
+                        result['failed'].append(v)
+                    else:
+                        result['new' if added else 'unchanged'].append(v)
+        
+        return result
+
+    async def get_undelivered_vacancies(self, sources: List[str], since: datetime,
+                                        limit: int = 5000) -> List[Dict]:
+        """Hali alert tarqatishdan o'tmagan (yoki o'shandan keyin o'zgargan) vakansiyalar
+
+        Qaysi yo'l (fon sikli, user qidiruvi, fon yangilash) saqlaganidan qat'i nazar -
+        yangilik faqat `mark_vacancies_matched` bilan "sarflanadi". `version` - o'sha
+        paytdagi updated_at, belgilashda undan keyingi o'zgarish yo'qolmasligi uchun.
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT 
+                        id,
+                        vacancy_id as external_id,
+                        title,
+                        company,
+                        description,
+                        salary_min,
+                        salary_max,
+                        location,
+                        experience_level,
+                        url,
+                        source,
+                        published_date,
+                        coalesce(updated_at, created_at) as version
+                    FROM vacancies
+                    WHERE (matched_at IS NULL OR matched_at < updated_at)
+                    AND published_date > $1
+                    AND source = ANY($2::text[])
+                    ORDER BY published_date DESC
+                    LIMIT $3
+                ''', since, list(sources), limit)
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ get_undelivered_vacancies xatolik: {e}")
+            return []
+
+    async def mark_vacancies_matched(self, vacancies: List[Dict]) -> bool:
+        """Tarqatishdan o'tgan vakansiyalarni belgilash (o'qilgan versiyasigacha)"""
+        if not vacancies:
+            return True
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute('''
+                    UPDATE vacancies v
+                    SET matched_at = coalesce(m.version, NOW())
+                    FROM unnest($1::bigint[], $2::timestamptz[]) AS m(id, version)
+                    WHERE v.id = m.id
+                ''', [v['id'] for v in vacancies], [v.get('version') for v in vacancies])
+                return True
+        except Exception as e:
+            logger.error(f"❌ mark_vacancies_matched xatolik: {e}")
+            return False
+
+    async def expire_undelivered_vacancies(self, before: datetime) -> int:
+        """Alert oynasidan eskirgan, tarqatilmagan vakansiyalarni belgilash (indeks o'smasligi uchun)"""
+        try:
+            async with self.pool.acquire() as conn:
+                result = await conn.execute('''
+                    UPDATE vacancies
+                    SET matched_at = coalesce(updated_at, created_at, NOW())
+                    WHERE (matched_at IS NULL OR matched_at < updated_at)
+                    AND published_date <= $1
+                ''', before)
+                return int(result.split()[-1])
+        except Exception as e:
+            logger.error(f"❌ expire_undelivered_vacancies xatolik: {e}")
+            return 0
+
+    async def add_vacancies_bulk(self, vacancies: List[Dict]) -> Set[str]:
+        """Vakansiyalarni bulk saqlash - yangi qo'shilganlarning external_id lari"""
+        result = await self.ingest_vacancies(vacancies)
+        return {str(v.get('external_id')) for v in result['new']}
 
     async def get_vacancy(self, vacancy_id: str) -> Optional[Dict]:
         """ID bo'yicha vakansiyani olish"""
@@ -490,40 +648,326 @@ class Database:
             logger.error(f"❌ get_vacancy xatolik: {e}")
             return None
     
-    # ========== SENT VACANCIES ==========
+    async def get_vacancies_by_ids(self, vacancy_ids: List[str]) -> List[Dict]:
+        """ID lar bo'yicha vakansiyalar (berilgan tartibda, topilmaganlari tashlab ketiladi)"""
+        if not vacancy_ids:
+            return []
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT 
+                        vacancy_id as external_id,
+                        title,
+                        company,
+                        description,
+                        salary_min,
+                        salary_max,
+                        location,
+                        experience_level,
+                        url,
+                        source,
+                        published_date
+                    FROM vacancies
+                    WHERE vacancy_id = ANY($1)
+                ''', list(vacancy_ids))
+            by_id = {row['external_id']: dict(row) for row in rows}
+            return [by_id[vid] for vid in vacancy_ids if vid in by_id]
+        except Exception as e:
+            logger.error(f"❌ get_vacancies_by_ids xatolik: {e}")
+            return []
     
-    async def mark_vacancy_sent(self, user_id: int, vacancy_id: str, vacancy_title: str = None):
-        """Yuborilgan vakansiyani belgilash"""
+    # ========== TELEGRAM CHANNEL WATERMARKS ==========
+    
+    async def get_channel_watermarks(self) -> Dict[str, int]:
+        """Har bir kanal uchun oxirgi ko'rilgan xabar ID sini olish"""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    'SELECT channel, last_message_id FROM telegram_channel_state'
+                )
+                return {row['channel']: row['last_message_id'] for row in rows}
+        except Exception as e:
+            logger.error(f"❌ get_channel_watermarks xatolik: {e}")
+            return {}
+    
+    async def save_channel_watermarks(self, watermarks: Dict[str, int]) -> bool:
+        """Kanallar watermarklarini saqlash (faqat oldinga siljitiladi)"""
+        if not watermarks:
+            return True
         try:
             now = datetime.now(timezone.utc)
             
+            async with self.pool.acquire() as conn:
+                await conn.executemany('''
+                    INSERT INTO telegram_channel_state (channel, last_message_id, updated_at)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (channel) DO UPDATE
+                    SET last_message_id = GREATEST(telegram_channel_state.last_message_id, EXCLUDED.last_message_id),
+                        updated_at = EXCLUDED.updated_at
+                ''', [(channel, int(msg_id), now) for channel, msg_id in watermarks.items()])
+                return True
+        except Exception as e:
+            logger.error(f"❌ save_channel_watermarks xatolik: {e}")
+            return False
+    
+    # ========== CRAWL WATERMARKS ==========
+    
+    async def get_crawl_watermarks(self, source: str) -> Dict[str, datetime]:
+        """Manba bo'yicha crawl watermarklarini olish (kalit -> vaqt)"""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    'SELECT key, watermark FROM crawl_state WHERE source = $1',
+                    source
+                )
+                return {row['key']: row['watermark'] for row in rows}
+        except Exception as e:
+            logger.error(f"❌ get_crawl_watermarks xatolik: {e}")
+            return {}
+    
+    async def save_crawl_watermark(self, source: str, key: str, watermark: datetime) -> bool:
+        """Crawl watermarkini saqlash (faqat oldinga siljitiladi)"""
+        try:
             async with self.pool.acquire() as conn:
                 await conn.execute('''
-                    INSERT INTO sent_vacancies (user_id, vacancy_id, vacancy_title, sent_at)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (user_id, vacancy_id) DO NOTHING
-                ''', user_id, vacancy_id, vacancy_title, now)
-                
+                    INSERT INTO crawl_state (source, key, watermark, updated_at)
+                    VALUES ($1, $2, $3, NOW())
+                    ON CONFLICT (source, key) DO UPDATE
+                    SET watermark = GREATEST(crawl_state.watermark, EXCLUDED.watermark),
+                        updated_at = NOW()
+                ''', source, key, watermark)
                 return True
         except Exception as e:
-            logger.debug(f"add_sent_vacancy: {e}")
+            logger.error(f"❌ save_crawl_watermark xatolik: {e}")
             return False
     
+    async def get_search_freshness(self, keys: List[str]) -> Dict[str, datetime]:
+        """Qidiruv freshness kalitlari (manba:kalit, manba:*) bo'yicha oxirgi yangilangan vaqt"""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT key, watermark FROM crawl_state
+                    WHERE source = 'search' AND key = ANY($1)
+                ''', list(keys))
+                return {row['key']: row['watermark'] for row in rows}
+        except Exception as e:
+            logger.error(f"❌ get_search_freshness xatolik: {e}")
+            return {}
+    
+    async def prune_search_freshness(self, max_age: timedelta) -> int:
+        """Eskirgan qidiruv freshness yozuvlarini o'chirish (har bir so'rov kaliti yangi qator yozadi)"""
+        try:
+            async with self.pool.acquire() as conn:
+                result = await conn.execute('''
+                    DELETE FROM crawl_state
+                    WHERE source = 'search' AND updated_at < NOW() - $1::interval
+                ''', max_age)
+                return int(result.split()[-1])
+        except Exception as e:
+            logger.error(f"❌ prune_search_freshness xatolik: {e}")
+            return 0
+    
+    async def search_vacancies(self, query, since: Optional[datetime] = None, limit: int = 50,
+                               sources: Optional[List[str]] = None) -> List[Dict]:
+        """Bazadan to'liq matnli qidiruv (relevantlik bo'yicha saralangan)
+
+        query - matn yoki kalit so'zlar ro'yxati (kalit so'zlar OR bilan birlashtiriladi).
+        Har bir so'z plainto_tsquery (ru/en/simple) orqali - foydalanuvchi matnidagi `-`,
+        qo'shtirnoq va `or` operator sifatida talqin qilinmaydi. search_tsv GIN indeksidan
+        tashqari sarlavha+kompaniya va description bo'yicha substring (pg_trgm indekslari) -
+        stemming topmagan holatlar uchun. query bo'sh bo'lsa - shunchaki eng yangi vakansiyalar.
+        """
+        terms = [query] if isinstance(query, str) else list(query or [])
+        terms = [t.strip() for t in terms if t and t.strip()]
+        
+        args = []
+        def param(value):
+            args.append(value)
+            return f'${len(args)}'
+        
+        conditions = []
+        rank = '0'
+        if terms:
+            tsqueries = []
+            substrings = []
+            for term in terms:
+                text = param(term)
+                tsqueries.append(
+                    f"plainto_tsquery('russian', {text}) || plainto_tsquery('english', {text})"
+                    f" || plainto_tsquery('simple', {text})"
+                )
+                # LIKE metabelgilari (\, %, _) so'zma-so'z qidiriladi
+                pattern = param('%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+                # Ifodalar migrations.py dagi trigram indekslar bilan aynan bir xil
+                substrings.append(f"(coalesce(title, '') || ' ' || coalesce(company, '')) ILIKE {pattern} ESCAPE '\\'")
+                substrings.append(f"left(coalesce(description, ''), 20000) ILIKE {pattern} ESCAPE '\\'")
+            tsquery = '(' + ' || '.join(tsqueries) + ')'
+            conditions.append(f"(search_tsv @@ {tsquery} OR " + ' OR '.join(substrings) + ')')
+            rank = f'ts_rank_cd(search_tsv, {tsquery})'
+        if since is not None:
+            conditions.append(f'published_date > {param(since)}')
+        if sources:
+            if len(sources) == 1:
+                # Bitta manba - (source, published_date) indeksi tartibni ham beradi
+                conditions.append(f'source = {param(sources[0])}')
+            else:
+                conditions.append(f'source = ANY({param(list(sources))}::text[])')
+        order_by = 'rank DESC, published_date DESC' if terms else 'published_date DESC'
+        
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(f'''
+                    SELECT 
+                        vacancy_id,
+                        vacancy_id as external_id,
+                        title,
+                        company,
+                        description,
+                        salary_min,
+                        salary_max,
+                        location,
+                        experience_level,
+                        url,
+                        source,
+                        published_date,
+                        {rank} as rank
+                    FROM vacancies
+                    {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                    ORDER BY {order_by}
+                    LIMIT {param(limit)}
+                ''', *args)
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ search_vacancies xatolik: {e}")
+            return []
+    
+    # ========== SENT VACANCIES ==========
+    # Alert dedupe logi: sent_alerts (user_id, vacancies.id) + xotiradagi Bloom filter keshi
+    
+    async def mark_vacancy_sent(self, user_id: int, vacancy_id: str, vacancy_title: str = None):
+        """Yuborilgan vakansiyani belgilash"""
+        return await self.mark_sent_bulk([(user_id, vacancy_id)]) > 0
+    
     async def is_vacancy_sent(self, user_id: int, vacancy_id: str) -> bool:
         """Vakansiya yuborilganmi?"""
+        return not await self.filter_unsent(user_id, [vacancy_id])
+
+    async def get_vacancy_keys(self, vacancy_ids: List[str]) -> Dict[str, int]:
+        """Matnli vacancy_id -> butun sonli surrogate kalit (vacancies.id)"""
+        if not vacancy_ids:
+            return {}
         try:
             async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    'SELECT 1 FROM sent_vacancies WHERE user_id = $1 AND vacancy_id = $2',
-                    user_id, vacancy_id
+                rows = await conn.fetch(
+                    'SELECT vacancy_id, id FROM vacancies WHERE vacancy_id = ANY($1::text[])',
+                    list(dict.fromkeys(str(v) for v in vacancy_ids))
                 )
-                return row is not None
-        except:
-            return False
+                return {row['vacancy_id']: row['id'] for row in rows}
+        except Exception as e:
+            logger.error(f"❌ get_vacancy_keys xatolik: {e}")
+            return {}
+
+    async def _load_sent_cache(self, conn, user_ids: List[int]):
+        """Keshda yo'q userlarning yuborilgan kalitlarini bitta so'rovda yuklash"""
+        from utils.sent_cache import sent_cache
+        
+        missing = sent_cache.missing(user_ids)
+        if not missing:
+            return
+        rows = await conn.fetch('''
+            SELECT user_id, array_agg(vacancy_key) AS keys
+            FROM sent_alerts
+            WHERE user_id = ANY($1::bigint[])
+            GROUP BY user_id
+        ''', missing)
+        loaded = {row['user_id']: row['keys'] for row in rows}
+        for user_id in missing:
+            sent_cache.load(user_id, loaded.get(user_id, []))
+
+    async def filter_unsent(self, user_id: int, vacancy_ids: List[str]) -> List[str]:
+        """Userga hali yuborilmagan vakansiya ID lari (kirish tartibi saqlanadi)"""
+        unsent = await self.filter_unsent_pairs([(user_id, vid) for vid in vacancy_ids])
+        return [vid for _, vid in unsent]
+
+    async def filter_unsent_pairs(self, pairs: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """(user_id, vacancy_id) juftliklaridan hali yuborilmaganlarini qaytarish
+
+        Aksariyat juftliklar xotiradagi Bloom filter bilan hal qilinadi, faqat "ehtimol
+        yuborilgan"lari bitta anti-join bilan bazadan tekshiriladi. Kirish tartibi saqlanadi.
+        Bazada yo'q vakansiyalar va xatolik holati - yuborilmaydi (takroran yubormaslik uchun).
+        """
+        if not pairs:
+            return []
+        from utils.sent_cache import sent_cache
+        
+        try:
+            keys = await self.get_vacancy_keys([v for _, v in pairs])
+            candidates = [(int(u), str(v), keys[str(v)]) for u, v in pairs if str(v) in keys]
+            if not candidates:
+                return []
+            
+            async with self.pool.acquire() as conn:
+                await self._load_sent_cache(conn, [u for u, _, _ in candidates])
+                
+                maybe_sent = [(u, k) for u, _, k in candidates if sent_cache.might_contain(u, k) is not False]
+                really_sent = set()
+                if maybe_sent:
+                    rows = await conn.fetch('''
+                        SELECT c.user_id, c.vacancy_key
+                        FROM unnest($1::bigint[], $2::int[]) AS c(user_id, vacancy_key)
+                        WHERE EXISTS (
+                            SELECT 1 FROM sent_alerts sa
+                            WHERE sa.user_id = c.user_id AND sa.vacancy_key = c.vacancy_key
+                        )
+                    ''', [u for u, _ in maybe_sent], [k for _, k in maybe_sent])
+                    really_sent = {(row['user_id'], row['vacancy_key']) for row in rows}
+                    sent_cache.stats['false_positives'] += len(maybe_sent) - len(really_sent)
+            
+            return [(u, v) for u, v, k in candidates if (u, k) not in really_sent]
+        except Exception as e:
+            logger.error(f"❌ filter_unsent_pairs xatolik: {e}")
+            return []
+
+    async def mark_sent_bulk(self, pairs: List[Tuple[int, str]]) -> int:
+        """Bir nechta (user_id, vacancy_id) ni bitta so'rovda yuborilgan deb belgilash"""
+        if not pairs:
+            return 0
+        from utils.sent_cache import sent_cache
+        
+        try:
+            user_ids = [int(u) for u, _ in pairs]
+            vacancy_ids = [str(v) for _, v in pairs]
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    INSERT INTO sent_alerts (user_id, vacancy_key, sent_at)
+                    SELECT DISTINCT c.user_id, v.id, NOW()
+                    FROM unnest($1::bigint[], $2::text[]) AS c(user_id, vacancy_id)
+                    JOIN vacancies v ON v.vacancy_id = c.vacancy_id
+                    ON CONFLICT (user_id, vacancy_key) DO NOTHING
+                    RETURNING user_id, vacancy_key
+                ''', user_ids, vacancy_ids)
+            for row in rows:
+                sent_cache.add(row['user_id'], row['vacancy_key'])
+            return len(rows)
+        except Exception as e:
+            logger.error(f"❌ mark_sent_bulk xatolik: {e}")
+            return 0
 
-    async def add_sent_vacancy(self, user_id: int, vacancy_id: str, vacancy_title: str = None):
-        """Alias for mark_vacancy_sent to match handler expectation"""
-        return await self.mark_vacancy_sent(user_id, vacancy_id, vacancy_title)
+    # ========== FAVORITES ==========
+
+    async def add_favorite(self, user_id: int, vacancy_id: str, vacancy_title: str = None) -> bool:
+        """Vakansiyani saqlanganlarga qo'shish"""
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO favorites (user_id, vacancy_id, vacancy_title, saved_at)
+                    VALUES ($1, $2, $3, NOW())
+                    ON CONFLICT (user_id, vacancy_id) DO NOTHING
+                ''', user_id, vacancy_id, vacancy_title)
+                return True
+        except Exception as e:
+            logger.error(f"❌ add_favorite xatolik: {e}")
+            return False
 
     async def add_resume(self, **kwargs):
         """Rezyume qo'shish"""
@@ -637,19 +1081,11 @@ class Database:
             if not user_filter or not user_filter.get('keywords'):
                 return []
             
-            keywords = [f"%{k}%" for k in user_filter.get('keywords', [])]
-            if not keywords: return []
-            
-            async with self.pool.acquire() as conn:
-                rows = await conn.fetch('''
-                    SELECT * FROM vacancies 
-                    WHERE (title ILIKE ANY($1) OR description ILIKE ANY($1))
-                      AND published_date > NOW() - INTERVAL '24 hours'
-                    ORDER BY published_date DESC
-                    LIMIT $2
-                ''', keywords, limit)
-                
-                return [dict(r) for r in rows]
+            return await self.search_vacancies(
+                user_filter['keywords'],
+                since=datetime.now(timezone.utc) - timedelta(hours=24),
+                limit=limit,
+            )
         except Exception as e:
             logger.error(f"get_recent_vacancies_for_user error: {e}")
             return []
@@ -84,7 +84,7 @@ async def cmd_favorites(message: Message):
                 SELECT 
                     sv.vacancy_id,
                     sv.vacancy_title,
-                    sv.sent_at,
+                    sv.saved_at,
                     v.title,
                     v.company,
                     v.location,
@@ -92,14 +92,14 @@ async def cmd_favorites(message: Message):
                     v.salary_max,
                     v.url,
                     v.source
-                FROM sent_vacancies sv
+                FROM favorites sv
                 LEFT JOIN vacancies v ON sv.vacancy_id = v.vacancy_id
                 WHERE sv.user_id = $1
-                ORDER BY sv.sent_at DESC
+                ORDER BY sv.saved_at DESC
                 LIMIT 5
             ''', user_id)
             
-            total = await conn.fetchval('SELECT COUNT(*) FROM sent_vacancies WHERE user_id = $1', user_id)
+            total = await conn.fetchval('SELECT COUNT(*) FROM favorites WHERE user_id = $1', user_id)
             total_pages = (total + 4) // 5
         
         if not favorites:
@@ -138,7 +138,7 @@ async def save_favorite(callback: CallbackQuery):
         lang = await get_user_lang(user_id)
         
         # Saqlash
-        success = await db.add_sent_vacancy(
+        success = await db.add_favorite(
             user_id, 
             vacancy_id, 
             "Saved by user"
@@ -165,7 +165,7 @@ async def unsave_favorite(callback: CallbackQuery):
         
         async with db.pool.acquire() as conn:
             await conn.execute('''
-                DELETE FROM sent_vacancies
+                DELETE FROM favorites
                 WHERE user_id = $1 AND vacancy_id = $2
             ''', user_id, vacancy_id)
         
@@ -212,7 +212,7 @@ async def confirm_clear_favorites(callback: CallbackQuery):
         
         async with db.pool.acquire() as conn:
             await conn.execute('''
-                DELETE FROM sent_vacancies
+                DELETE FROM favorites
                 WHERE user_id = $1
             ''', user_id)
         
@@ -238,14 +238,14 @@ async def refresh_favorites(callback: CallbackQuery):
         async with db.pool.acquire() as conn:
             favorites = await conn.fetch('''
                 SELECT sv.vacancy_id, sv.vacancy_title, v.title, v.company, v.location, v.salary_min, v.salary_max
-                FROM sent_vacancies sv
+                FROM favorites sv
                 LEFT JOIN vacancies v ON sv.vacancy_id = v.vacancy_id
                 WHERE sv.user_id = $1
-                ORDER BY sv.sent_at DESC
+                ORDER BY sv.saved_at DESC
                 LIMIT 5
             ''', user_id)
             
-            total = await db.pool.fetchval('SELECT COUNT(*) FROM sent_vacancies WHERE user_id = $1', user_id)
+            total = await db.pool.fetchval('SELECT COUNT(*) FROM favorites WHERE user_id = $1', user_id)
             total_pages = (total + 4) // 5
         
         if not favorites:
@@ -285,13 +285,13 @@ async def saved_page(callback: CallbackQuery):
         async with db.pool.acquire() as conn:
             favorites = await conn.fetch('''
                 SELECT sv.vacancy_id, sv.vacancy_title, v.title, v.company, v.location, v.salary_min, v.salary_max
-                FROM sent_vacancies sv
+                FROM favorites sv
                 LEFT JOIN vacancies v ON sv.vacancy_id = v.vacancy_id
                 WHERE sv.user_id = $1
-                ORDER BY sv.sent_at DESC
+                ORDER BY sv.saved_at DESC
                 LIMIT 5 OFFSET $2
             ''', user_id, page * 5)
-            total = await db.pool.fetchval('SELECT COUNT(*) FROM sent_vacancies WHERE user_id = $1', user_id)
+            total = await db.pool.fetchval('SELECT COUNT(*) FROM favorites WHERE user_id = $1', user_id)
             total_pages = (total + 4) // 5
         
         if not favorites:
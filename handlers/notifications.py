@@ -265,7 +265,7 @@ async def notification_stats(callback: CallbackQuery):
                     COUNT(*) as total,
                     COUNT(*) FILTER (WHERE sent_at > NOW() - INTERVAL '24 hours') as today,
                     COUNT(*) FILTER (WHERE sent_at > NOW() - INTERVAL '7 days') as week
-                FROM sent_vacancies
+                FROM sent_alerts
                 WHERE user_id = $1
             ''', callback.from_user.id)
         
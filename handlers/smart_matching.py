@@ -165,14 +165,12 @@ async def smart_best_match(callback: CallbackQuery):
         # User profili
         user_filter = await db.get_user_filter(callback.from_user.id)
         
-        # Vakansiyalarni olish (oxirgi 7 kun)
-        async with db.pool.acquire() as conn:
-            vacancies = await conn.fetch('''
-                SELECT * FROM vacancies
-                WHERE published_date > NOW() - INTERVAL '7 days'
-                ORDER BY published_date DESC
-                LIMIT 100
-            ''')
+        # Vakansiyalarni olish (oxirgi 7 kun, kalit so'zlar bo'yicha eng relevantlari)
+        vacancies = await db.search_vacancies(
+            (user_filter or {}).get('keywords') or [],
+            since=datetime.now(timezone.utc) - timedelta(days=7),
+            limit=100,
+        )
         
         if not vacancies:
             await callback.message.edit_text(await get_text("smart_no_results", lang=lang), parse_mode='HTML')
@@ -236,13 +234,11 @@ async def smart_top_10(callback: CallbackQuery):
     try:
         user_filter = await db.get_user_filter(callback.from_user.id)
         
-        async with db.pool.acquire() as conn:
-            vacancies = await conn.fetch('''
-                SELECT * FROM vacancies
-                WHERE published_date > NOW() - INTERVAL '7 days'
-                ORDER BY published_date DESC
-                LIMIT 100
-            ''')
+        vacancies = await db.search_vacancies(
+            (user_filter or {}).get('keywords') or [],
+            since=datetime.now(timezone.utc) - timedelta(days=7),
+            limit=100,
+        )
         
         # Scoring
         scored_vacancies = []
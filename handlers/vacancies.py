@@ -4,9 +4,11 @@ from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, C
 from aiogram.fsm.context import FSMContext
 from database import db
 import logging
-from uzjobs_scraper import uz_jobs_scraper
 import asyncio
-from datetime import datetime
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +20,74 @@ user_vacancies = {}
 # Qidiruv jarayonidagi userlar (bir vaqtda bitta qidiruv)
 searching_users = set()
 
-# Qidiruv natijalari keshi (keywords + location + source -> vacancies)
-# Format: { 'keyword+location+sources': {'time': timestamp, 'vacancies': [...]} }
-search_cache = {}
+# Qidiruv natijalari keshi (keywords + location + source -> vakansiya ID lari)
 CACHE_TIMEOUT = 300  # 5 daqiqa
 
+
+class SearchCache:
+    """Qidiruv natijalari uchun LRU + TTL kesh (single-flight bilan)
+
+    To'liq vakansiya dict lari o'rniga faqat ID lar (ixcham havolalar)
+    saqlanadi - natija bazadan bitta so'rov bilan tiklanadi. Hajm yozuvlar
+    soni va jami ID lar soni bilan cheklanadi.
+    """
+
+    def __init__(self, ttl: int = CACHE_TIMEOUT, max_entries: int = 256, max_refs: int = 20000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_refs = max_refs
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._total_refs = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry['time'] > self.ttl:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, vacancies: List[Dict], sources_used: List[Dict]):
+        refs = tuple(
+            str(v.get('external_id')) for v in vacancies if v.get('external_id')
+        )
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = {'time': time.monotonic(), 'refs': refs, 'sources_used': sources_used}
+        self._total_refs += len(refs)
+
+        # Eng eski yozuvlarni chiqarib tashlash
+        while len(self._entries) > self.max_entries or (self._total_refs > self.max_refs and len(self._entries) > 1):
+            self._remove(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._total_refs -= len(entry['refs'])
+
+    def join(self, key: str) -> Optional[asyncio.Future]:
+        """Shu kalit bo'yicha qidiruv ketayotgan bo'lsa - uning natijasini kutish uchun future"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return future
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        return None
+
+    def release(self, key: str):
+        """Qidiruv tugadi - kutayotganlarni uyg'otish"""
+        future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(self.get(key))
+
+
+search_cache = SearchCache()
+
 # Telegram scraper instanceni import qilish
 telegram_scraper_instance = None
 
@@ -95,6 +160,41 @@ async def get_vacancy_keyboard(user_id: int, current_index: int, total: int, vac
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+async def build_vacancy_markup(user_id: int, vacancy: Dict, index: int, total: int, lang: str) -> InlineKeyboardMarkup:
+    """Vakansiya kartochkasi klaviaturasi (to'liq ma'lumot + navigatsiya)"""
+    # To'liq ma'lumot tugmasi
+    url_button = InlineKeyboardButton(
+        text=await get_text("btn_full_info", lang=lang),
+        url=vacancy.get('url', '#')
+    )
+    
+    # Klaviatura yaratish
+    vacancy_id = vacancy.get('external_id') or vacancy.get('id')
+    
+    from config import ADMIN_IDS
+    is_admin = user_id in ADMIN_IDS
+    vacancy_source = vacancy.get('source', 'hh_uz')
+    
+    keyboard = await get_vacancy_keyboard(user_id, index, total, str(vacancy_id) if vacancy_id else None, is_admin, vacancy_source)
+    keyboard.inline_keyboard.insert(0, [url_button])
+    return keyboard
+
+
+async def refresh_vacancy_card(user_id: int, lang: str):
+    """Ro'yxat kattalashganda ochiq kartochkadagi hisoblagich va tugmalarni yangilash"""
+    data = user_vacancies.get(user_id)
+    if not data or not data.get('card'):
+        return
+    
+    index = data['current_index']
+    vacancies = data['vacancies']
+    try:
+        keyboard = await build_vacancy_markup(user_id, vacancies[index], index, len(vacancies), lang)
+        await data['card'].edit_reply_markup(reply_markup=keyboard)
+    except Exception as e:
+        logger.debug(f"Kartochka yangilanmadi: {e}")
+
+
 async def send_vacancy_to_user(message_or_callback, user_id: int, index: int):
     """Vakansiyani yuborish yoki yangilash"""
     lang = await get_user_lang(user_id)
@@ -119,21 +219,7 @@ async def send_vacancy_to_user(message_or_callback, user_id: int, index: int):
     from filters import vacancy_filter
     vacancy_text = vacancy_filter.format_vacancy_message(vacancy, lang=lang)
     
-    # To'liq ma'lumot tugmasi
-    url_button = InlineKeyboardButton(
-        text=await get_text("btn_full_info", lang=lang),
-        url=vacancy.get('url', '#')
-    )
-    
-    # Klaviatura yaratish
-    vacancy_id = vacancy.get('external_id') or vacancy.get('id')
-    
-    from config import ADMIN_IDS
-    is_admin = user_id in ADMIN_IDS
-    vacancy_source = vacancy.get('source', 'hh_uz')
-    
-    keyboard = await get_vacancy_keyboard(user_id, index, len(vacancies), str(vacancy_id) if vacancy_id else None, is_admin, vacancy_source)
-    keyboard.inline_keyboard.insert(0, [url_button])
+    keyboard = await build_vacancy_markup(user_id, vacancy, index, len(vacancies), lang)
     
     try:
         if isinstance(message_or_callback, CallbackQuery):
@@ -145,7 +231,8 @@ async def send_vacancy_to_user(message_or_callback, user_id: int, index: int):
             )
             await message_or_callback.answer()
         else:
-            await message_or_callback.answer(
+            # Kartochka keyinroq kelgan natijalar bilan yangilanishi uchun saqlanadi
+            data['card'] = await message_or_callback.answer(
                 vacancy_text,
                 reply_markup=keyboard,
                 parse_mode='HTML',
@@ -220,224 +307,224 @@ async def perform_vacancy_search(message: Message, user_id: int):
     # Qidiruv jarayonini belgilash
     searching_users.add(user_id)
     
-    # Qidiruv jarayonini boshlash
-    keywords = user_filter.get('keywords', [])
-    locations = user_filter.get('locations', ['Tashkent'])
-    sources = user_filter.get('sources', ['hh_uz', 'user_post'])
-    
-    wait_msg = await message.answer(
-        (await t("search_start")).format(
-            keywords=", ".join(keywords),
-            location=locations[0] if locations else "Tashkent"
-        ), 
-        parse_mode='HTML'
-    )
+    is_leader = False
+    wait_msg = None
+    try:
+        # Qidiruv jarayonini boshlash
+        keywords = user_filter.get('keywords', [])
+        locations = user_filter.get('locations', ['Tashkent'])
+        sources = user_filter.get('sources', ['hh_uz', 'user_post'])
+    
+        wait_msg = await message.answer(
+            (await t("search_start")).format(
+                keywords=", ".join(keywords),
+                location=", ".join(locations) if locations else "Tashkent"
+            ), 
+            parse_mode='HTML'
+        )
     
-    # Kesh kalitini yaratish
-    import time
-    cache_key = f"{'+'.join(sorted(keywords))}_{locations[0] if locations else 'Tashkent'}_{'+'.join(sorted(sources))}"
-    
-    # Keshtan tekshirish
-    if cache_key in search_cache:
-        cached_data = search_cache[cache_key]
-        if time.time() - cached_data['time'] < CACHE_TIMEOUT:
-            logger.info(f"[SEARCH] Cache hit for {cache_key}")
-            vacancies = cached_data['vacancies']
-            sources_used = cached_data['sources_used']
+        # Kesh kalitini yaratish
+        cache_key = f"{'+'.join(sorted(keywords))}_{'+'.join(sorted(locations)) if locations else 'Tashkent'}_{'+'.join(sorted(sources))}"
+    
+        # Keshdan tekshirish; xuddi shu qidiruv boshqa user uchun ketayotgan bo'lsa - o'shani kutamiz
+        from config import SEARCH_DEADLINE
+        cached = search_cache.get(cache_key)
+        if cached is None:
+            waiting = search_cache.join(cache_key)
+            if waiting is None:
+                is_leader = True
+            else:
+                try:
+                    cached = await asyncio.wait_for(asyncio.shield(waiting), timeout=SEARCH_DEADLINE)
+                except asyncio.TimeoutError:
+                    cached = None
+    
+        if cached is not None:
+            vacancies = await db.get_vacancies_by_ids(list(cached['refs']))
+            if vacancies or not cached['refs']:
+                search_cache.stats['hits'] += 1
+                logger.info(f"[SEARCH] Cache hit for {cache_key}")
             
-            # Agar keshda ma'lumot bo'lsa, davom ettiramiz (scraping qilmasdan)
-            await process_search_results(message, user_id, vacancies, sources_used, wait_msg, features, user_filter)
-            searching_users.discard(user_id)
-            return
+                # Agar keshda ma'lumot bo'lsa, davom ettiramiz (scraping qilmasdan)
+                await process_search_results(message, user_id, vacancies, cached['sources_used'], wait_msg, features, user_filter)
+                return
+        search_cache.stats['misses'] += 1
 
-    try:
-        # Vakansiyalarni olish
-        from scraper_api import scraper_api
-        from filters import vacancy_filter
+        from vacancy_sources import vacancy_sources, query_key
         
-        # Premium bo'lsa, Telegram manbasini avtomatik qo'shish (search da ham)
+        # Premium bo'lsa, Telegram manbasini avtomatik qo'shish (filtr ham uni o'tkazishi uchun)
         if is_premium and 'telegram' not in sources:
             sources.append('telegram')
+        
+        # Manbalar: user sozlamasi + tarif
+        source_names = vacancy_sources.select(sources, is_premium)
             
-        logger.info(f"[SEARCH] User {user_id}: keywords={keywords}, locations={locations}, sources={sources}")
+        logger.info(f"[SEARCH] User {user_id}: keywords={keywords}, locations={locations}, sources={source_names}")
+        
+        query = {
+            'keywords': keywords,
+            'locations': locations or ['Tashkent'],
+            'pages': features.get('scraping_pages', 2),  # Sahifalar soni
+            'interactive': True,
+        }
+        fresh_key = query_key(keywords, query['locations'])
         
-        # Sahifalar soni
-        pages = features.get('scraping_pages', 2)
+        # DB-FIRST - fon scraping bazaga yig'gan vakansiyalardan darhol javob
+        from filters import vacancy_filter
+        from config import SEARCH_DB_FIRST, SEARCH_FRESHNESS_MINUTES, SEARCH_LOCAL_DAYS
+        if SEARCH_DB_FIRST:
+            local_vacancies = await db.search_vacancies(
+                keywords,
+                since=datetime.now(timezone.utc) - timedelta(days=SEARCH_LOCAL_DAYS),
+                limit=300,
+                sources=source_names,
+            )
+            if vacancy_filter.apply_filters(local_vacancies, user_filter):
+                stale = await vacancy_sources.stale_sources(
+                    fresh_key, source_names, timedelta(minutes=SEARCH_FRESHNESS_MINUTES)
+                )
+                if stale:
+                    # Faqat eskirgan manbalar userni kutdirmasdan fonda yangilanadi
+                    vacancy_sources.refresh(query, stale, fresh_key)
+                
+                logger.info(f"[SEARCH] DB-first: {len(local_vacancies)} ta (eskirgan manbalar: {stale})")
+                sources_used = await summarize_sources(local_vacancies, lang)
+                search_cache.put(cache_key, local_vacancies, sources_used)
+                await process_search_results(message, user_id, local_vacancies, sources_used, wait_msg, features, user_filter)
+                return
         
         # Vakansiyalar ro'yxati
         vacancies = []
         sources_used = []
+        live_results = []
         
-        # PARALLEL SCRAPING - hammasi bir vaqtda
-        tasks = []
-        
-        # 1. Database'dan user-posted vakansiyalar (FAST)
-        async def get_user_posted():
-            try:
-                logger.info("[SEARCH] Fetching user-posted vacancies...")
-                async with db.pool.acquire() as conn:
-                    db_vacancies = await conn.fetch('''
-                        SELECT 
-                            vacancy_id as external_id,
-                            title,
-                            company,
-                            description,
-                            salary_min,
-                            salary_max,
-                            location,
-                            experience_level,
-                            url,
-                            source,
-                            published_date
-                        FROM vacancies
-                        WHERE source = 'user_post'
-                        AND published_date > NOW() - INTERVAL '30 days'
-                        ORDER BY published_date DESC
-                        LIMIT 50
-                    ''')
-                    
-                    user_posted = [dict(row) for row in db_vacancies]
-                    
-                    if user_posted:
-                        logger.info(f"[SEARCH] User-posted: {len(user_posted)} ta")
-                        return (await t("source_user_post"), '📢', user_posted)
-                    return None
-            except Exception as e:
-                logger.error(f"[SEARCH] User-posted error: {e}")
-                return None
-        
-        tasks.append(get_user_posted())
-        
-        # 2. hh.uz dan scraping (PARALLEL)
-        async def get_hh_uz():
-            if 'hh_uz' in sources:
-                try:
-                    logger.info(f"[SEARCH] hh.uz scraping: pages={pages}")
-                    hh_vacancies = await scraper_api.scrape_hh_uz(
-                        keywords=keywords,
-                        location=locations[0] if locations else 'Tashkent',
-                        pages=pages
-                    )
-                    if hh_vacancies:
-                        logger.info(f"[SEARCH] hh.uz: {len(hh_vacancies)} ta")
-                        return (await t("source_hh_uz"), '🌐', hh_vacancies)
-                    return None
-                except Exception as e:
-                    logger.error(f"[SEARCH] hh.uz error: {e}")
-                    return None
-            return None
-        
-        tasks.append(get_hh_uz())
-        
-        # 3. Telegram kanallaridan (PARALLEL, Premium only)
-        async def get_telegram():
-            if 'telegram' in sources and is_premium:
-                try:
-                    logger.info("[SEARCH] Fetching Telegram vacancies from DB...")
-                    async with db.pool.acquire() as conn:
-                        # Bazadan Telegram vakansiyalarni olish
-                        tg_db_vacancies = await conn.fetch('''
-                            SELECT 
-                                vacancy_id as external_id,
-                                title,
-                                company,
-                                description,
-                                salary_min,
-                                salary_max,
-                                location,
-                                experience_level,
-                                url,
-                                source,
-                                published_date
-                            FROM vacancies
-                            WHERE source = 'telegram'
-                            AND published_date > NOW() - INTERVAL '7 days'
-                            ORDER BY published_date DESC
-                            LIMIT 300
-                        ''')
-                        
-                        tg_vacancies = [dict(row) for row in tg_db_vacancies]
-                        
-                        if tg_vacancies:
-                            # Telegram kanallarini guruhlashtirish
-                            tg_channels = {}
-                            for vac in tg_vacancies:
-                                external_id = vac.get('external_id', '')
-                                # Parsing tg_@channel_id format
-                                if external_id.startswith('tg_'):
-                                    parts = external_id.split('_')
-                                    if len(parts) >= 2:
-                                        channel = parts[1]
-                                        tg_channels[channel] = tg_channels.get(channel, 0) + 1
-                            
-                            logger.info(f"[SEARCH] Telegram DB: {len(tg_vacancies)} ta")
-                            return (await t("source_telegram"), '📱', tg_vacancies, tg_channels)
-                        return None
-                except Exception as e:
-                    logger.error(f"[SEARCH] Telegram DB error: {e}")
-                    return None
-            return None
+        # PROGRESSIV - har bir manba tugashi bilan natijalar ko'rsatiladi, wait_msg joyida yangilanadi
+        max_results = features.get('max_results', 10)
+        shown = []  # Filtrlangan va cheklangan ro'yxat (user ko'radigan)
+        limited = False
+        pending = len(source_names)
+        results_text = None
         
-        tasks.append(get_telegram())
-        
-        # 4. UzJobs (NEW)
-        async def get_uzjobs():
+        async def edit_wait_msg(text: str):
             try:
-                logger.info("[SEARCH] Fetching from UzJobs...")
-                res = await uz_jobs_scraper.scrape_uzjobs(keywords)
-                if res:
-                    return (await t("source_uzjobs"), '🌐', res)
-                return None
+                await wait_msg.edit_text(text, parse_mode='HTML')
             except Exception as e:
-                logger.error(f"[SEARCH] UzJobs error: {e}")
-                return None
-        
-        tasks.append(get_uzjobs())
+                logger.debug(f"[SEARCH] wait_msg yangilanmadi: {e}")
         
-        # PARALLEL EXECUTION - HAMMASI BIR VAQTDA!
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Natijalarni yig'ish
-        for result in results:
-            if result and not isinstance(result, Exception):
-                if len(result) == 4:  # Telegram (with channels)
-                    name, emoji, vacs, channels = result
-                    vacancies.extend(vacs)
-                    sources_used.append({
-                        'name': name,
-                        'emoji': emoji,
-                        'count': len(vacs),
-                        'channels': channels
-                    })
-                elif len(result) == 3:  # Others
-                    name, emoji, vacs = result
-                    vacancies.extend(vacs)
-                    sources_used.append({
-                        'name': name,
-                        'emoji': emoji,
-                        'count': len(vacs)
-                    })
+        async for result in vacancy_sources.search_iter(query, source_names, SEARCH_DEADLINE):
+            pending -= 1
+            live_results.append(result)
+            if result['vacancies']:
+                source = vacancy_sources.get(result['source'])
+                vacancies.extend(result['vacancies'])
+                sources_used.append({
+                    'name': await t(source.title_key),
+                    'emoji': source.emoji,
+                    'count': len(result['vacancies']),
+                    **result['meta']
+                })
+                
+                # Yangi natijalar ro'yxat oxiriga qo'shiladi - ko'rilayotgan tartib buzilmaydi
+                for vacancy in vacancy_filter.apply_filters(result['vacancies'], user_filter):
+                    if len(shown) >= max_results:
+                        limited = True
+                        break
+                    shown.append(vacancy)
+            
+            if not shown or (results_text is not None and not result['vacancies']):
+                continue
+            
+            results_text = await render_results_text(lang, len(shown), sources_used, limited, max_results, pending > 0)
+            await edit_wait_msg(results_text)
+            
+            if user_vacancies.get(user_id, {}).get('vacancies') is not shown:
+                # Birinchi natijalar - darhol birinchi vakansiyani ko'rsatish
+                user_vacancies[user_id] = {'vacancies': shown, 'current_index': 0}
+                await send_vacancy_to_user(message, user_id, 0)
+            else:
+                await refresh_vacancy_card(user_id, lang)
         
-        # Keshga saqlash
-        search_cache[cache_key] = {
-            'time': time.time(),
-            'vacancies': vacancies,
-            'sources_used': sources_used
-        }
+        if results_text is None:
+            # Hech narsa ko'rsatilmadi - topilmadi / filtrga tushmadi xabari
+            await process_search_results(message, user_id, vacancies, sources_used, wait_msg, features, user_filter)
+        else:
+            final_text = await render_results_text(lang, len(shown), sources_used, limited, max_results)
+            if final_text != results_text:
+                await edit_wait_msg(final_text)
         
-        await process_search_results(message, user_id, vacancies, sources_used, wait_msg, features, user_filter)
+        # Jonli natijalar bazaga (keyingi qidiruvlar DB-first javob oladi), keyin keshga - ID lar bilan
+        await vacancy_sources.store(fresh_key, live_results)
+        search_cache.put(cache_key, vacancies, sources_used)
 
     except Exception as e:
         logger.error(f"[SEARCH] Qidiruvda xatolik: {e}", exc_info=True)
-        try:
-            await wait_msg.delete()
-        except:
-            pass
+        if wait_msg is not None:
+            try:
+                await wait_msg.delete()
+            except:
+                pass
         await message.answer(await t("search_error"), parse_mode='HTML')
     
     finally:
         # Qidiruv tugadi
         searching_users.discard(user_id)
+        if is_leader:
+            search_cache.release(cache_key)
+
+async def summarize_sources(vacancies: List[Dict], lang: str) -> List[Dict]:
+    """Vakansiyalarni manbalar bo'yicha sanash (natijalar xabari uchun)"""
+    from vacancy_sources import vacancy_sources
+    
+    by_source = {}
+    for vacancy in vacancies:
+        by_source.setdefault(vacancy.get('source'), []).append(vacancy)
+    
+    sources_used = []
+    for name, source in vacancy_sources.sources.items():
+        source_vacancies = by_source.get(name)
+        if source_vacancies:
+            sources_used.append({
+                'name': await get_text(source.title_key, lang=lang),
+                'emoji': source.emoji,
+                'count': len(source_vacancies),
+                **source.describe(source_vacancies)
+            })
+    return sources_used
+
+
+async def render_results_text(lang: str, count: int, sources_used: List[Dict], limited: bool,
+                              max_results: int, pending: bool = False) -> str:
+    """Natijalar xabari matni (manbalar bo'yicha sonlar bilan)"""
+    async def t(key): return await get_text(key, lang=lang)
+    
+    result_text = (await t("results_found")).format(count=count)
+    
+    # Manbalardagi natijalar
+    if sources_used:
+        result_text += await t("results_sources")
+        for source in sources_used:
+            result_text += f"{source['emoji']} <b>{source['name']}:</b> {source['count']} ta\n"
+            
+            # Telegram kanallari
+            if source['emoji'] == '📱' and source.get('channels'):
+                channels_list = []
+                for channel, count in sorted(source['channels'].items(), key=lambda x: x[1], reverse=True)[:5]:
+                    channels_list.append(f"  • {channel}: {count} ta")
+                if channels_list:
+                    result_text += "\n".join(channels_list) + "\n"
+        
+        result_text += "\n"
+    
+    if limited:
+        res_limited = await t("results_limited")
+        result_text += res_limited.format(count=max_results)
+    
+    if pending:
+        result_text += await t("results_pending")
+    
+    result_text += await t("results_view_action")
+    return result_text
+
 
 async def process_search_results(message: Message, user_id: int, vacancies: List[Dict], sources_used: List[Dict], wait_msg: Message, features: Dict, user_filter: Dict):
     """Qidiruv natijalarini qayta ishlash va userga yuborish"""
@@ -483,30 +570,7 @@ async def process_search_results(message: Message, user_id: int, vacancies: List
     }
     
     # === NATIJALAR XABARI ===
-    res_found = await t("results_found")
-    result_text = res_found.format(count=len(filtered_vacancies))
-    
-    # Manbalardagi natijalar
-    if sources_used:
-        result_text += await t("results_sources")
-        for source in sources_used:
-            result_text += f"{source['emoji']} <b>{source['name']}:</b> {source['count']} ta\n"
-            
-            # Telegram kanallari
-            if source['emoji'] == '📱' and source.get('channels'):
-                channels_list = []
-                for channel, count in sorted(source['channels'].items(), key=lambda x: x[1], reverse=True)[:5]:
-                    channels_list.append(f"  • {channel}: {count} ta")
-                if channels_list:
-                    result_text += "\n".join(channels_list) + "\n"
-        
-        result_text += "\n"
-    
-    if limited:
-        res_limited = await t("results_limited")
-        result_text += res_limited.format(count=max_results)
-    
-    result_text += await t("results_view_action")
+    result_text = await render_results_text(lang, len(filtered_vacancies), sources_used, limited, max_results)
     
     await message.answer(result_text, parse_mode='HTML')
     
@@ -565,7 +629,7 @@ async def save_vacancy(callback: CallbackQuery):
     lang = await get_user_lang(callback.from_user.id)
     try:
         vacancy_id = callback.data.split("_", 2)[2]
-        await db.add_sent_vacancy(callback.from_user.id, vacancy_id, "Saqlangan")
+        await db.add_favorite(callback.from_user.id, vacancy_id, "Saqlangan")
         await callback.answer(await get_text("vacancy_saved", lang=lang), show_alert=True)
     except Exception as e:
         logger.error(f"Vakansiya saqlashda xatolik: {e}")
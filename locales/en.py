@@ -264,6 +264,7 @@ Invite friends and get Premium bonus.""",
     "results_sources": "<b>Sources:</b>\n",
     "results_limited": "\n⚠️ <i>Too many results. Showing first {count}.</i>\n",
     "results_view_action": "\nUse buttons below to view 👇",
+    "results_pending": "\n⏳ <i>Still searching other sources...</i>\n",
     "source_hh_uz": "hh.uz",
     "source_user_post": "Users",
     "source_telegram": "Telegram",
@@ -264,6 +264,7 @@ text = {
     "results_sources": "<b>Источники:</b>\n",
     "results_limited": "\n⚠️ <i>Результатов слишком много. Показаны первые {count}.</i>\n",
     "results_view_action": "\nИспользуйте кнопки ниже для просмотра 👇",
+    "results_pending": "\n⏳ <i>Идёт поиск в других источниках...</i>\n",
     "source_hh_uz": "hh.uz",
     "source_user_post": "Пользователи",
     "source_telegram": "Telegram",
@@ -259,6 +259,7 @@ Cheksiz imkoniyatlarga ega bo‘lish uchun obuna bo‘ling.""",
     "results_sources": "<b>Manbalar:</b>\n",
     "results_limited": "\n⚠️ <i>Natijalar ko‘p. Faqat {count} tasi ko‘rsatilmoqda.</i>\n",
     "results_view_action": "\nVakansiyalarni ko‘rish uchun pastdagi tugmalardan foydalaning 👇",
+    "results_pending": "\n⏳ <i>Boshqa manbalardan qidirilmoqda...</i>\n",
     "source_hh_uz": "hh.uz",
     "source_user_post": "Foydalanuvchilar",
     "source_telegram": "Telegram",
@@ -0,0 +1,388 @@
+"""
+Versiyalangan sxema migratsiyalari
+
+Har bir migratsiya bir marta, tartib bo'yicha bajariladi va `schema_migrations`
+jadvaliga yoziladi. Bir nechta instance bir vaqtda ishga tushsa - advisory lock
+orqali faqat bittasi migratsiya qiladi.
+
+- oddiy migratsiyalar bitta tranzaksiyada bajariladi (xatolikda to'liq bekor qilinadi);
+- `transactional=False` - katta jadvallarda `CREATE INDEX CONCURRENTLY` uchun
+  (yozishlarni bloklamaydi, lekin tranzaksiya ichida ishlamaydi).
+
+Qo'lda ishga tushirish va hot querylar rejasini tekshirish:
+    python migrations.py --check
+"""
+
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock kaliti (ixtiyoriy, lekin loyiha bo'yicha o'zgarmas)
+MIGRATION_LOCK_ID = 7_310_024
+
+# Katta jadvallardagi qadamlar uchun (pool dagi command_timeout=60 yetmaydi)
+LONG_STEP_TIMEOUT = 3600
+
+
+class Migration:
+    """Bitta sxema versiyasi: SQL matnlar va/yoki async funksiyalar ro'yxati"""
+
+    def __init__(self, version: int, name: str, steps: List[Union[str, Callable]],
+                 transactional: bool = True):
+        self.version = version
+        self.name = name
+        self.steps = steps
+        self.transactional = transactional
+
+
+def concurrent_index(name: str, definition: str, unique: bool = False) -> Callable:
+    """CREATE INDEX CONCURRENTLY qadami (oldingi muvaffaqiyatsiz urinishdan qolgan INVALID indeks o'chiriladi)"""
+    async def step(conn):
+        invalid = await conn.fetchval(
+            'SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)', name
+        )
+        if invalid:
+            logger.warning(f"INVALID indeks {name} qayta quriladi")
+            await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+        await conn.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}",
+            timeout=LONG_STEP_TIMEOUT
+        )
+    step.__name__ = f'index:{name}'
+    return step
+
+
+async def _copy_sent_vacancies(conn):
+    """Eski sent_vacancies dan alert logi va saqlanganlarni ko'chirish"""
+    if not await conn.fetchval("SELECT to_regclass('sent_vacancies') IS NOT NULL"):
+        return
+    await conn.execute('''
+        INSERT INTO sent_alerts (user_id, vacancy_key, sent_at)
+        SELECT sv.user_id, v.id, MIN(sv.sent_at)
+        FROM sent_vacancies sv
+        JOIN vacancies v ON v.vacancy_id = sv.vacancy_id
+        GROUP BY sv.user_id, v.id
+        ON CONFLICT DO NOTHING
+    ''', timeout=LONG_STEP_TIMEOUT)
+    # Qo'lda saqlanganlar - sarlavha bilan yozilgan qatorlar
+    await conn.execute('''
+        INSERT INTO favorites (user_id, vacancy_id, vacancy_title, saved_at)
+        SELECT user_id, vacancy_id, vacancy_title, sent_at
+        FROM sent_vacancies
+        WHERE vacancy_title IS NOT NULL
+        ON CONFLICT DO NOTHING
+    ''', timeout=LONG_STEP_TIMEOUT)
+
+
+# Qidiruv ifodalari - Database.search_vacancies dagi bilan aynan bir xil bo'lishi kerak (aks holda indeks ishlatilmaydi)
+_TITLE_COMPANY = "coalesce(title, '') || ' ' || coalesce(company, '')"
+_DESCRIPTION = "left(coalesce(description, ''), 20000)"
+
+
+def trigram_index(name: str, expression: str) -> Callable:
+    """pg_trgm indeksi - substring (ILIKE '%...%') qidiruvi uchun
+
+    Extension yaratishga huquq bo'lmasa - ogohlantirish bilan o'tkazib yuboriladi:
+    qidiruv ishlayveradi, faqat substring qismi indekssiz bo'ladi.
+    """
+    async def step(conn):
+        try:
+            await conn.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except Exception as e:
+            logger.warning(f"pg_trgm o'rnatilmadi, trigram indeks {name} o'tkazib yuborildi: {e}")
+            return
+        await concurrent_index(name, f'vacancies USING GIN (({expression}) gin_trgm_ops)')(conn)
+    step.__name__ = f'trigram:{name}'
+    return step
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'baseline', [
+        # Users jadvali
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id BIGINT PRIMARY KEY,
+            username VARCHAR(255),
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            language VARCHAR(5) DEFAULT 'uz',
+            is_active BOOLEAN DEFAULT TRUE,
+            premium_until TIMESTAMPTZ,
+            referred_by BIGINT,
+            role VARCHAR(50) DEFAULT 'seeker',
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        ''',
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS language VARCHAR(5) DEFAULT 'uz'",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS role VARCHAR(50) DEFAULT 'seeker'",
+        # Resumes jadvali
+        '''
+        CREATE TABLE IF NOT EXISTS resumes (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT REFERENCES users(user_id),
+            full_name VARCHAR(255),
+            age INTEGER,
+            technology TEXT,
+            telegram_username VARCHAR(255),
+            phone VARCHAR(50),
+            region VARCHAR(255),
+            salary VARCHAR(255),
+            profession VARCHAR(255),
+            call_time VARCHAR(255),
+            goal TEXT,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        ''',
+        # Crawler holati (manba + kalit -> oxirgi ko'rilgan e'lon vaqti)
+        '''
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            source VARCHAR(50) NOT NULL,
+            key VARCHAR(255) NOT NULL,
+            watermark TIMESTAMPTZ NOT NULL,
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (source, key)
+        )
+        ''',
+        # Vakansiya mazmuni hashi (o'zgargan e'lonlarni aniqlash uchun)
+        'ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS content_hash VARCHAR(40)',
+        'ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ',
+        # Telegram kanallari holati (oxirgi ko'rilgan xabar ID - watermark)
+        '''
+        CREATE TABLE IF NOT EXISTS telegram_channel_state (
+            channel VARCHAR(255) PRIMARY KEY,
+            last_message_id BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        ''',
+        # Yuborilgan alertlar (dedupe logi) - butun sonli kalit: vacancies.id
+        '''
+        CREATE TABLE IF NOT EXISTS sent_alerts (
+            user_id BIGINT NOT NULL,
+            vacancy_key INTEGER NOT NULL,
+            sent_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (user_id, vacancy_key)
+        )
+        ''',
+        # Saqlangan vakansiyalar (alertlar tarixidan alohida)
+        '''
+        CREATE TABLE IF NOT EXISTS favorites (
+            user_id BIGINT NOT NULL,
+            vacancy_id VARCHAR(255) NOT NULL,
+            vacancy_title TEXT,
+            saved_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (user_id, vacancy_id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_favorites_user_saved ON favorites (user_id, saved_at DESC)',
+    ]),
+    Migration(2, 'copy_sent_vacancies', [_copy_sent_vacancies]),
+    Migration(3, 'hot_query_indexes', [
+        # Oxirgi vakansiyalar (smart matching, digest, DB qidiruv)
+        concurrent_index('idx_vacancies_published', 'vacancies (published_date DESC)'),
+        # Manba bo'yicha oxirgilari (user_post, DB-first qidiruv)
+        concurrent_index('idx_vacancies_source_published', 'vacancies (source, published_date DESC)'),
+        # Referral statistikasi va ro'yxati
+        concurrent_index('idx_users_referred_by', 'users (referred_by, created_at DESC)'),
+        # Faol userlar (admin panel, tarqatish)
+        concurrent_index('idx_users_active_updated', 'users (is_active, updated_at DESC)'),
+        # Userning oxirgi rezyumesi
+        concurrent_index('idx_resumes_user_created', 'resumes (user_id, created_at DESC)'),
+    ], transactional=False),
+    Migration(4, 'vacancies_search_tsv', [
+        # Ko'p tilli to'liq matnli qidiruv: ru/en stemming + simple (o'zbekcha va boshqalar uchun)
+        # title/company - 'A' vazn, description - 'B'. Juda uzun tavsif tsvector limitidan oshmasligi uchun kesiladi
+        f'''
+        ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', {_TITLE_COMPANY}), 'A') ||
+            setweight(to_tsvector('english', {_TITLE_COMPANY}), 'A') ||
+            setweight(to_tsvector('simple', {_TITLE_COMPANY}), 'A') ||
+            setweight(to_tsvector('russian', {_DESCRIPTION}), 'B') ||
+            setweight(to_tsvector('english', {_DESCRIPTION}), 'B') ||
+            setweight(to_tsvector('simple', {_DESCRIPTION}), 'B')
+        ) STORED
+        ''',
+    ]),
+    Migration(5, 'vacancies_search_indexes', [
+        concurrent_index('idx_vacancies_search_tsv', 'vacancies USING GIN (search_tsv)'),
+        trigram_index('idx_vacancies_title_trgm', _TITLE_COMPANY),
+    ], transactional=False),
+    # Telegram / user_post e'lonlarida butun matn - description; substring qidiruvi uchun
+    Migration(6, 'vacancies_description_trgm', [
+        trigram_index('idx_vacancies_description_trgm', _DESCRIPTION),
+    ], transactional=False),
+    # Alert tarqatish holati: matched_at < updated_at - hali tarqatilmagan versiya.
+    # Mavjud yozuvlar allaqachon tarqatilgan hisoblanadi
+    Migration(7, 'vacancies_matched_at', [
+        'ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS matched_at TIMESTAMPTZ',
+        '''
+        UPDATE vacancies SET matched_at = coalesce(updated_at, created_at, NOW())
+        WHERE matched_at IS NULL
+        ''',
+    ]),
+    Migration(8, 'vacancies_undelivered_index', [
+        concurrent_index(
+            'idx_vacancies_undelivered',
+            'vacancies (published_date) WHERE matched_at IS NULL OR matched_at < updated_at'
+        ),
+    ], transactional=False),
+]
+
+
+async def _run_step(conn, step: Union[str, Callable]):
+    if callable(step):
+        await step(conn)
+    else:
+        await conn.execute(step, timeout=LONG_STEP_TIMEOUT)
+
+
+async def run_migrations(pool) -> List[int]:
+    """Bajarilmagan migratsiyalarni tartib bilan qo'llash (qo'llanganlar versiyalari qaytariladi)"""
+    applied_now = []
+    async with pool.acquire() as conn:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMPTZ DEFAULT NOW()
+            )
+        ''')
+        await conn.execute('SELECT pg_advisory_lock($1)', MIGRATION_LOCK_ID)
+        try:
+            applied = {row['version'] for row in await conn.fetch('SELECT version FROM schema_migrations')}
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                if migration.version in applied:
+                    continue
+
+                logger.info(f"🛠 Migratsiya {migration.version} ({migration.name})...")
+                if migration.transactional:
+                    async with conn.transaction():
+                        for step in migration.steps:
+                            await _run_step(conn, step)
+                        await conn.execute(
+                            'INSERT INTO schema_migrations (version, name) VALUES ($1, $2)',
+                            migration.version, migration.name
+                        )
+                else:
+                    # Har bir qadam idempotent - yarmida uzilsa keyingi ishga tushishda davom etadi
+                    for step in migration.steps:
+                        await _run_step(conn, step)
+                    await conn.execute(
+                        'INSERT INTO schema_migrations (version, name) VALUES ($1, $2)',
+                        migration.version, migration.name
+                    )
+                applied_now.append(migration.version)
+                logger.info(f"✅ Migratsiya {migration.version} ({migration.name}) qo'llandi")
+        finally:
+            await conn.execute('SELECT pg_advisory_unlock($1)', MIGRATION_LOCK_ID)
+    return applied_now
+
+
+# Hot querylar va ular ishlatishi kerak bo'lgan indeks
+HOT_QUERIES = [
+    ('recent_vacancies', 'idx_vacancies_published', '''
+        SELECT * FROM vacancies
+        WHERE published_date > NOW() - INTERVAL '7 days'
+        ORDER BY published_date DESC
+        LIMIT 100
+    '''),
+    ('user_posts', 'idx_vacancies_source_published', '''
+        SELECT * FROM vacancies
+        WHERE source = 'user_post' AND published_date > NOW() - INTERVAL '30 days'
+        ORDER BY published_date DESC
+        LIMIT 50
+    '''),
+    ('favorites_page', 'idx_favorites_user_saved', '''
+        SELECT vacancy_id, vacancy_title FROM favorites
+        WHERE user_id = 0
+        ORDER BY saved_at DESC
+        LIMIT 5
+    '''),
+    ('referral_stats', 'idx_users_referred_by', '''
+        SELECT COUNT(*) FROM users WHERE referred_by = 0
+    '''),
+    ('active_users', 'idx_users_active_updated', '''
+        SELECT user_id, updated_at FROM users
+        WHERE is_active = TRUE
+        ORDER BY updated_at DESC
+        LIMIT 20
+    '''),
+    ('latest_resume', 'idx_resumes_user_created', '''
+        SELECT * FROM resumes WHERE user_id = 0 ORDER BY created_at DESC LIMIT 1
+    '''),
+    ('undelivered_vacancies', 'idx_vacancies_undelivered', '''
+        SELECT id FROM vacancies
+        WHERE (matched_at IS NULL OR matched_at < updated_at)
+        AND published_date > NOW() - INTERVAL '3 days'
+        ORDER BY published_date DESC
+        LIMIT 5000
+    '''),
+    ('fulltext_search', 'idx_vacancies_search_tsv', '''
+        SELECT vacancy_id FROM vacancies
+        WHERE search_tsv @@ plainto_tsquery('simple', 'python')
+        LIMIT 20
+    '''),
+]
+
+
+def _plan_indexes(node: Dict) -> List[str]:
+    """EXPLAIN (FORMAT JSON) rejasidagi barcha ishlatilgan indekslar"""
+    found = [node['Index Name']] if 'Index Name' in node else []
+    for child in node.get('Plans', []):
+        found.extend(_plan_indexes(child))
+    return found
+
+
+async def check_query_plans(pool) -> Dict[str, Optional[List[str]]]:
+    """Hot querylar kutilgan indeksni ishlata olishini EXPLAIN orqali tekshirish
+
+    Kichik jadvallarda planner seq scan ni afzal ko'radi, shuning uchun tekshiruv
+    `enable_seqscan = off` bilan bajariladi - indeks query shakliga mosligi tekshiriladi.
+    Natija: query nomi -> ishlatilgan indekslar (xatolikda None).
+    """
+    results = {}
+    async with pool.acquire() as conn:
+        for name, index, sql in HOT_QUERIES:
+            try:
+                async with conn.transaction():
+                    await conn.execute('SET LOCAL enable_seqscan = off')
+                    raw = await conn.fetchval(f'EXPLAIN (FORMAT JSON) {sql}')
+                plan = json.loads(raw) if isinstance(raw, str) else raw
+                used = _plan_indexes(plan[0]['Plan'])
+                results[name] = used
+                if index in used:
+                    logger.info(f"✅ EXPLAIN {name}: {index}")
+                else:
+                    logger.warning(f"⚠️ EXPLAIN {name}: {index} ishlatilmadi (ishlatilgan: {used or 'seq scan'})")
+            except Exception as e:
+                logger.error(f"EXPLAIN {name} xatolik: {e}")
+                results[name] = None
+    return results
+
+
+if __name__ == '__main__':
+    import asyncio
+    import sys
+
+    import asyncpg
+
+    from config import DATABASE_URL
+
+    async def main():
+        pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=2)
+        try:
+            applied = await run_migrations(pool)
+            print(f"Qo'llangan migratsiyalar: {applied}")
+            if '--check' in sys.argv:
+                results = await check_query_plans(pool)
+                expected = {name: index for name, index, _ in HOT_QUERIES}
+                for name, used in results.items():
+                    status = 'OK' if used and expected[name] in used else 'FAIL'
+                    print(f"{status:4} {name}: {used}")
+        finally:
+            await pool.close()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
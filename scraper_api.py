@@ -1,11 +1,17 @@
-import aiohttp
 import asyncio
-from typing import List, Dict, Optional
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timezone
 import logging
+from utils.http_client import http_client
+from utils.rate_limit import AdaptiveRateLimiter, RequestTicket
 
 logger = logging.getLogger(__name__)
 
+# hh.uz ga boradigan barcha so'rovlar uchun yagona (process-wide) token bucket
+hh_rate_limiter = AdaptiveRateLimiter('hh.uz', rate=5.0, burst=5, min_rate=0.5)
+
 class VacancyScraperAPI:
     """hh.uz API orqali vakansiyalarni yig'ish"""
     
@@ -16,8 +22,16 @@ class VacancyScraperAPI:
             'Accept': 'application/json',
             'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7'
         }
-        # Connection pooling uchun session
-        self.session = None
+        # Barcha sahifa so'rovlari uchun umumiy cheklov (parallel fetch)
+        self.max_concurrency = 4
+        self._request_semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # Javoblar keshi (LRU + TTL) va bir xil so'rovlarni birlashtirish (single-flight)
+        self.cache_ttl = 120  # soniya
+        self.cache_max_entries = 500
+        self._response_cache: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Tuple[asyncio.Task, RequestTicket]] = {}
+        self.cache_stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
         
         # Shahar ID lari
         self.area_ids = {
@@ -36,86 +50,362 @@ class VacancyScraperAPI:
             'syrdarya': '2771',
             'kokand': '2772'
         }
+        
+        # Foydalanuvchi yozadigan muqobil nomlar (o'zbekcha / ruscha)
+        self.area_aliases = {
+            'toshkent': 'tashkent', 'ташкент': 'tashkent',
+            'samarqand': 'samarkand', 'самарканд': 'samarkand',
+            'buxoro': 'bukhara', 'бухара': 'bukhara',
+            'andijon': 'andijan', 'андижан': 'andijan',
+            "farg'ona": 'fergana', 'fargona': 'fergana', 'фергана': 'fergana',
+            'наманган': 'namangan',
+            'navoiy': 'navoi', 'навои': 'navoi',
+            'qashqadaryo': 'kashkadarya', 'qarshi': 'kashkadarya', 'карши': 'kashkadarya',
+            'xorazm': 'khorezm', 'urganch': 'khorezm', 'хорезм': 'khorezm',
+            'нукус': 'nukus',
+            'termez': 'termiz', 'термез': 'termiz',
+            'jizzax': 'jizzakh', 'джизак': 'jizzakh',
+            'sirdaryo': 'syrdarya', 'guliston': 'syrdarya', 'gulistan': 'syrdarya',
+            "qo'qon": 'kokand', 'qoqon': 'kokand', 'коканд': 'kokand',
+        }
 
     async def get_session(self):
-        """Shared session yaratish yoki qaytarish"""
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(headers=self.headers)
-        return self.session
-
-    async def close(self):
-        """Sessionni yopish"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Umumiy HTTP pool sessioni (keep-alive, DNS kesh) - yopish on_shutdown da"""
+        return await http_client.get_session()
 
-    async def scrape_hh_uz(self, keywords: List[str] = None, 
-                          location: str = 'Tashkent', 
-                          pages: int = 5) -> List[Dict]:
-        """hh.uz API dan vakansiyalarni yig'ish"""
-        vacancies = []
+    def resolve_area_ids(self, locations: List[str]) -> Tuple[str, ...]:
+        """Joylashuv nomlarini hh area ID lariga o'girish (tartiblangan, takrorsiz)"""
+        area_ids = set()
+        for location in locations or []:
+            name = (location or '').strip().lower()
+            name = self.area_aliases.get(name, name)
+            if name in self.area_ids:
+                area_ids.add(self.area_ids[name])
         
-        # Location ID ni aniqlash (dynamic)
-        location_lower = location.lower() if location else 'tashkent'
-        area_id = self.area_ids.get(location_lower, '2759')  # Default: Tashkent
+        # Hech biri topilmasa - Toshkent (avvalgi default)
+        return tuple(sorted(area_ids)) or ('2759',)
+    
+    @staticmethod
+    def _cache_key(search_text: str, area_ids: Tuple[str, ...], page: int) -> Tuple:
+        """Normallashtirilgan so'rov kaliti (so'zlar tartibi va registri ahamiyatsiz)"""
+        if any(op in search_text for op in ('(', ' OR ', ' AND ', ' NOT ')):
+            # Query language - tartib ma'noga ega, faqat bo'shliqlarni normallashtiramiz
+            words = (' '.join(search_text.lower().split()),)
+        else:
+            words = tuple(sorted(search_text.lower().split()))
+        return (words, area_ids, page)
+    
+    @staticmethod
+    def build_query_clause(keywords) -> str:
+        """Guruh kalit so'zlaridan hh query bo'lagi (so'zlar AND bilan - oddiy qidiruv kabi)"""
+        words = [w.lower() for keyword in keywords for w in keyword.split()]
+        if len(words) == 1:
+            return words[0]
+        return '(' + ' AND '.join(words) + ')'
+    
+    def plan_group_queries(self, group_keys: List[Tuple], max_query_length: int = 400,
+                           max_clauses: Optional[int] = None) -> List[Dict]:
+        """Qidiruv guruhlarini iloji boricha kam hh.uz so'rovlariga birlashtirish
         
-        # Keywords'ni birlashtirish
-        search_text = ' '.join(keywords) if keywords else 'python'
+        group_keys - [(keywords_tuple, locations_tuple), ...]. Bir xil hududlardagi
+        guruhlar `(a AND b) OR c OR ...` ko'rinishida bitta so'rovga yig'iladi
+        (uzunlik `max_query_length` dan, bo'laklar soni `max_clauses` dan - ya'ni
+        so'rovning sahifa budjetidan - oshmaguncha). Har bir guruh o'z bo'lagini oladi
+        (faqat so'zlari aynan bir xil guruhlar bitta bo'lakni bo'lishadi). Natijani userlarga ajratish VacancyFilter orqali lokal bajariladi.
         
-        logger.info(f"Qidiruv boshlandi: keywords='{search_text}', area={location} ({area_id}), pages={pages}")
+        Qaytaradi: [{'locations', 'query', 'groups': [group_key, ...], 'clauses'}]
+        """
+        by_area: Dict[Tuple, List[Tuple]] = {}
+        for key in group_keys:
+            by_area.setdefault(self.resolve_area_ids(key[1]), []).append(key)
         
-        session = await self.get_session()
+        plans = []
+        for area_ids, keys in by_area.items():
+            locations = list(keys[0][1])
+            keys.sort(key=lambda k: (len(k[0]), k[0]))
+            
+            clause_owners: Dict[frozenset, Dict] = {}  # so'zlar to'plami -> plan
+            current = None
+            for key in keys:
+                words = frozenset(w.lower() for keyword in key[0] for w in keyword.split())
+                if not words:
+                    continue
+                
+                owner = clause_owners.get(words)
+                if owner is not None:
+                    owner['groups'].append(key)
+                    continue
+                
+                clause = self.build_query_clause(key[0])
+                fits = (
+                    current is not None
+                    and len(current['query']) + len(' OR ') + len(clause) <= max_query_length
+                    and (max_clauses is None or current['clauses'] < max_clauses)
+                )
+                if fits:
+                    current['query'] += ' OR ' + clause
+                    current['clauses'] += 1
+                    current['groups'].append(key)
+                else:
+                    current = {'locations': locations, 'query': clause, 'groups': [key], 'clauses': 1}
+                    plans.append(current)
+                clause_owners[words] = current
         
-        for page in range(pages):
-            url = f"{self.base_url}/vacancies"
-            params = {
-                'text': search_text,
-                'area': area_id,
-                'page': page,
-                'per_page': 50  # 50 ta
-            }
+        return plans
+    
+    def _cache_get(self, key: Tuple) -> Optional[Dict]:
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return data
+    
+    def _cache_put(self, key: Tuple, data: Dict):
+        self._response_cache[key] = (time.monotonic(), data)
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self.cache_max_entries:
+            self._response_cache.popitem(last=False)
+    
+    async def _fetch_page(self, session, search_text: str, area_ids: Tuple[str, ...], page: int,
+                          interactive: bool = False) -> Optional[Dict]:
+        """Bitta sahifani olish - avval keshdan, bir xil parallel so'rovlar esa bitta so'rovni kutadi"""
+        key = self._cache_key(search_text, area_ids, page)
+        
+        data = self._cache_get(key)
+        if data is not None:
+            self.cache_stats['hits'] += 1
+            logger.info(f"API cache hit: page={page}")
+            return data
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            task, ticket = inflight
+            self.cache_stats['coalesced'] += 1
+            if interactive:
+                # Fon so'roviga qo'shilgan user uni rate limiter navbatida oldinga suradi
+                hh_rate_limiter.promote(ticket)
+        else:
+            self.cache_stats['misses'] += 1
+            ticket = RequestTicket(interactive)
+            task = asyncio.create_task(
+                self._request_page(session, search_text, area_ids, page, ticket)
+            )
+            self._inflight[key] = (task, ticket)
             
-            logger.info(f"API request: page={page}")
+            def _done(t: asyncio.Task, key=key):
+                self._inflight.pop(key, None)
+                if not t.cancelled() and t.exception() is None and t.result() is not None:
+                    self._cache_put(key, t.result())
             
-            try:
-                async with session.get(url, params=params, timeout=30) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        items = data.get('items', [])
-                        found = data.get('found', 0)
-                        
-                        logger.info(f"Page {page}: topildi {len(items)} ta, jami mavjud {found} ta")
-                        
-                        if not items:
-                            logger.warning("Items bo'sh, to'xtatilmoqda")
-                            break
-                        
-                        for item in items:
-                            try:
-                                vacancy = self.parse_vacancy(item)
-                                if vacancy:
-                                    vacancies.append(vacancy)
-                            except Exception as e:
-                                logger.error(f"Item parse xatolik: {e}")
-                                continue
+            task.add_done_callback(_done)
+        
+        # shield: bitta chaqiruvchi bekor qilinsa, boshqalar uchun so'rov davom etadi
+        return await asyncio.shield(task)
+    
+    async def _request_page(self, session, search_text: str, area_ids: Tuple[str, ...], page: int,
+                            ticket: Optional[RequestTicket] = None, retries: int = 3) -> Optional[Dict]:
+        """Qidiruv sahifasini so'rash (bir nechta hudud - takrorlangan `area` parametri)"""
+        params = [('text', search_text)]
+        params += [('area', area_id) for area_id in area_ids]
+        params += [('page', page), ('per_page', 50)]  # 50 ta
+        return await self._request_json(session, params, ticket=ticket, retries=retries)
+    
+    async def _request_json(self, session, params, interactive: bool = False,
+                            retries: int = 3, ticket: Optional[RequestTicket] = None) -> Optional[Dict]:
+        """hh.uz /vacancies ga haqiqiy HTTP so'rov (token bucket + umumiy semaphore ostida)
+        
+        params - dict yoki (kalit, qiymat) juftliklari ro'yxati (takrorlanuvchi kalitlar uchun).
+        Faqat 429 va 5xx qayta uriniladi; 403 (taqiq / captcha) - qayta urinish limitni
+        behuda sarflaydi. ticket - ustuvorlik kutish davomida ko'tarilishi mumkin (promote).
+        """
+        url = f"{self.base_url}/vacancies"
+        page = dict(params).get('page', 0)
+        if ticket is None:
+            ticket = RequestTicket(interactive)
+        
+        for attempt in range(retries):
+            await hh_rate_limiter.acquire(ticket=ticket)
+            logger.info(f"API request: page={page}{' (interactive)' if ticket.interactive else ''}")
+            
+            async with self._request_semaphore:
+                try:
+                    async with session.get(url, params=params, headers=self.headers, timeout=30) as response:
+                        hh_rate_limiter.on_response(response.status, response.headers.get('Retry-After'))
                         
-                        # Agar oxirgi sahifa bo'lsa
-                        total_pages = data.get('pages', 0)
-                        if page >= total_pages - 1:
-                            logger.info(f"Oxirgi sahifa ({page + 1}/{total_pages})")
-                            break
-                    else:
-                        logger.error(f"API xatolik: Status {response.status}")
-                        break
+                        if response.status == 200:
+                            return await response.json()
+                        if response.status == 403:
+                            logger.error(f"API 403 (taqiq/captcha): page {page} - qayta urinilmaydi")
+                            return None
+                        if response.status != 429 and response.status < 500:
+                            logger.error(f"API xatolik: Status {response.status} (page {page})")
+                            return None
+                        logger.warning(f"API {response.status}: page {page}, urinish {attempt + 1}/{retries}")
+                except asyncio.TimeoutError:
+                    logger.error(f"Timeout: page {page}")
+                    return None
+                except Exception as e:
+                    logger.error(f"API request xatolik: {e}", exc_info=True)
+                    return None
             
-            except asyncio.TimeoutError:
-                logger.error(f"Timeout: page {page}")
+            # 429 - limiter o'zi pauza qiladi; 5xx - semaphore dan tashqarida qisqa backoff
+            if response.status >= 500 and attempt + 1 < retries:
+                await asyncio.sleep(min(2 ** attempt, 8))
+        
+        logger.error(f"API: page {page} {retries} urinishdan keyin ham olinmadi")
+        return None
+    
+    async def crawl_area(self, area_id: str, date_from: datetime, per_page: int = 100,
+                         max_depth: int = 2000) -> Tuple[List[Dict], Optional[datetime], bool]:
+        """Hududdagi `date_from` dan keyin e'lon qilingan barcha vakansiyalarni olish
+        
+        Kalit so'zsiz, order_by=publication_time (eng yangisi birinchi) bo'yicha
+        sahifalab o'qiladi. hh API chuqurligi page * per_page <= max_depth - chegaraga
+        yetilsa oyna `date_to` = ko'rilgan eng eski vaqt bilan toraytirilib davom etadi.
+        Qaytaradi: (vakansiyalar, eng yangi published_date, complete). complete=False
+        bo'lsa (sahifa olinmadi yoki oyna toraymadi) watermark surilmasligi kerak.
+        """
+        session = await self.get_session()
+        vacancies = []
+        seen = set()
+        newest = None
+        complete = True
+        date_to = None
+        fetched_pages = 0
+        
+        def _fmt(dt: datetime) -> str:
+            return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S%z')
+        
+        max_pages = max(1, max_depth // per_page)
+        while True:
+            oldest = None
+            exhausted = False
+            page = 0
+            while page < max_pages:
+                params = {
+                    'area': area_id,
+                    'date_from': _fmt(date_from),
+                    'order_by': 'publication_time',
+                    'page': page,
+                    'per_page': per_page
+                }
+                if date_to is not None:
+                    params['date_to'] = _fmt(date_to)
+                data = await self._request_json(session, params)
+                if not data:
+                    complete = False
+                    break
+                
+                items = data.get('items', [])
+                for vacancy in self._parse_items(items):
+                    published = vacancy.get('published_date')
+                    if published and (oldest is None or published < oldest):
+                        oldest = published
+                    # Oynalar chegarasida (date_to) bir xil vakansiya ikki marta kelishi mumkin
+                    if vacancy['external_id'] in seen:
+                        continue
+                    seen.add(vacancy['external_id'])
+                    vacancies.append(vacancy)
+                    if published and (newest is None or published > newest):
+                        newest = published
+                
+                page += 1
+                fetched_pages += 1
+                if not items or page * per_page >= data.get('found', 0):
+                    exhausted = True
+                    break
+                if page >= data.get('pages', 0):
+                    break
+            
+            if not complete or exhausted:
                 break
-            except Exception as e:
-                logger.error(f"API request xatolik: {e}", exc_info=True)
+            
+            # Chuqurlik chegarasi - qolgan eskilarini date_to bilan toraytirilgan oynada o'qiymiz
+            if oldest is None or (date_to is not None and oldest >= date_to):
+                logger.warning(f"🗺 Crawl area={area_id}: oyna toraymadi, crawl to'liq emas")
+                complete = False
                 break
+            date_to = oldest
+        
+        status = '' if complete else ", to'liq emas"
+        logger.info(f"🗺 Crawl area={area_id}: {len(vacancies)} ta vakansiya ({fetched_pages} sahifa{status})")
+        return vacancies, newest, complete
+    
+    def _parse_items(self, items: List[Dict]) -> List[Dict]:
+        """Sahifadagi itemlarni parse qilish"""
+        vacancies = []
+        for item in items:
+            try:
+                vacancy = self.parse_vacancy(item)
+                if vacancy:
+                    vacancies.append(vacancy)
+            except Exception as e:
+                logger.error(f"Item parse xatolik: {e}")
+                continue
+        return vacancies
+    
+    async def scrape_hh_uz(self, keywords: List[str] = None, 
+                          location: str = 'Tashkent', 
+                          pages: int = 5,
+                          interactive: bool = False,
+                          query: str = None,
+                          locations: List[str] = None) -> Optional[List[Dict]]:
+        """hh.uz API dan vakansiyalarni yig'ish (birinchi sahifa olinmasa - None)
+        
+        0-sahifa jami sahifalar sonini bilish uchun olinadi, qolganlari esa
+        parallel so'raladi va natija sahifa tartibida birlashtiriladi.
+        interactive=True - user qidiruvi, rate limiter navbatida fon so'rovlardan oldin.
+        query - tayyor hh query (plan_group_queries natijasi), berilsa keywords o'rniga.
+        locations - bir nechta hudud; barchasi bitta so'rovda yuboriladi (location o'rniga).
+        """
+        # Hududlar ID lari (dynamic)
+        if not locations:
+            locations = [location or 'Tashkent']
+        area_ids = self.resolve_area_ids(locations)
+        
+        # Keywords'ni birlashtirish
+        if query:
+            search_text = query
+        else:
+            search_text = ' '.join(keywords) if keywords else 'python'
+        
+        logger.info(f"Qidiruv boshlandi: keywords='{search_text}', areas={locations} ({','.join(area_ids)}), pages={pages}")
+        
+        session = await self.get_session()
+        
+        # 1. Birinchi sahifa - jami sahifalar sonini aniqlash
+        first = await self._fetch_page(session, search_text, area_ids, 0, interactive)
+        if first is None:
+            # 403 / 429 tugamadi / timeout - "topilmadi" emas, manba javob bermadi
+            return None
+        
+        items = first.get('items', [])
+        logger.info(f"Page 0: topildi {len(items)} ta, jami mavjud {first.get('found', 0)} ta")
+        if not items:
+            logger.warning("Items bo'sh, to'xtatilmoqda")
+            return []
+        
+        vacancies = self._parse_items(items)
+        
+        # 2. Qolgan sahifalar - parallel
+        total_pages = min(pages, first.get('pages', 0))
+        if total_pages > 1:
+            results = await asyncio.gather(*[
+                self._fetch_page(session, search_text, area_ids, page, interactive)
+                for page in range(1, total_pages)
+            ])
             
-            # API rate limiting uchun kutish
-            await asyncio.sleep(0.5)
+            # gather tartibni saqlaydi - natijalar sahifa tartibida
+            for page, data in enumerate(results, start=1):
+                if not data:
+                    continue
+                page_items = data.get('items', [])
+                logger.info(f"Page {page}: topildi {len(page_items)} ta")
+                vacancies.extend(self._parse_items(page_items))
         
         logger.info(f"✅ Jami {len(vacancies)} ta vakansiya topildi va parse qilindi")
         return vacancies
@@ -251,7 +541,7 @@ async def test_api():
     print(f"📍 Joylashuv: Tashkent")
     print(f"📄 Sahifalar: 2\n")
     
-    vacancies = await scraper_api.scrape_hh_uz(keywords=keywords, pages=2)
+    vacancies = await scraper_api.scrape_hh_uz(keywords=keywords, pages=2) or []
     
     print(f"\n{'='*70}")
     print(f"✅ NATIJA: {len(vacancies)} ta vakansiya")
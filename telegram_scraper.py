@@ -6,24 +6,119 @@ pip install telethon
 """
 
 import re
-from typing import List, Dict, Optional
+import time
+import asyncio
+from typing import List, Dict, Optional, Callable, Awaitable
 from datetime import datetime, timezone
 import logging
+from utils.parsing import run_parser
 
 logger = logging.getLogger(__name__)
 
 # Telethon import (optional)
 try:
-    from telethon import TelegramClient
+    from telethon import TelegramClient, events, utils as telethon_utils
     from telethon.tl.types import Message
+    from telethon.errors import FloodWaitError
     TELETHON_AVAILABLE = True
     logger.info("✅ Telethon mavjud")
 except ImportError:
     TELETHON_AVAILABLE = False
+    
+    class FloodWaitError(Exception):
+        seconds = 0
+    
     logger.warning("⚠️ Telethon o'rnatilmagan. Telegram scraper ishlamaydi.")
     logger.warning("O'rnatish: pip install telethon")
 
 
+# ========== PRECOMPILED MATCHERS ==========
+# Har bir xabar uchun qayta kompilyatsiya qilmaslik uchun barcha patternlar
+# modul yuklanganda bir marta kompilyatsiya qilinadi.
+
+def _trie_pattern(keywords) -> str:
+    """Kalit so'zlardan prefiks-daraxt (trie) ko'rinishidagi regex yasash
+    
+    Python `re` da Aho-Corasick yo'q, lekin umumiy prefikslari birlashtirilgan
+    alternation (`ish(?:\\ haqi|ga)?`) har bir pozitsiyada faqat bitta shoxni
+    tekshiradi - amalda bir o'tishli automat kabi ishlaydi.
+    """
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    
+    def build(node: Dict) -> str:
+        is_end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if is_end else body
+    
+    return build(trie)
+
+
+def _compile_keywords(keywords) -> "re.Pattern":
+    """Kalit so'zlar ro'yxatidan bitta kompilyatsiya qilingan automat"""
+    return re.compile(_trie_pattern(set(keywords)))
+
+
+EXCLUDE_KEYWORDS = [
+    'купить', 'продать', 'продаю', 'куплю', 'sotish', 'sotaman',
+    'reklama', 'advertisement', 'акция', 'скидка', 'chegirma'
+]
+EXCLUDE_RE = _compile_keywords(EXCLUDE_KEYWORDS)
+
+EMOJI_RE = re.compile(r'[#️⃣🔴🔵⚡️💼📌🔥✅❗️⭕️🟢🔴🟡⚪️💎🎯🚀📢🔔]')
+
+# Patternlar kichik harfli matnga qo'llanadi (IGNORECASE sekin), kompaniya nomi
+# esa asl matndan span bo'yicha kesib olinadi
+COMPANY_RES = [
+    re.compile(r'(?:компания|company|firma|kompaniya|tashkilot)[:\s]+([^\n]{3,100})'),
+    re.compile(r'(?:в компании|at company|da)[:\s]+([^\n]{3,100})'),
+    re.compile(r'(?:фирма|firm)[:\s]+([^\n]{3,100})'),
+]
+
+SALARY_RES = [
+    re.compile(r'(\d+)\s*[-–—]\s*(\d+)\s*(?:млн|mln|million|миллион)?'),
+    re.compile(r'(?:от|dan|from)\s+(\d+)'),
+    re.compile(r'(?:до|gacha|to)\s+(\d+)'),
+    re.compile(r'(?:зп|maosh|salary)[:\s]+(\d+)'),
+    re.compile(r'(\d+)\s*(?:млн|mln)'),
+    re.compile(r'(?:зарплата|oylik)[:\s]+(\d+)'),
+]
+
+# Tartib muhim: bir nechta shahar bo'lsa, ro'yxatdagi birinchisi tanlanadi
+LOCATION_KEYWORDS = {
+    'ташкент': 'Tashkent', 'tashkent': 'Tashkent', 'toshkent': 'Tashkent',
+    'самарканд': 'Samarkand', 'samarkand': 'Samarkand', 'samarqand': 'Samarkand',
+    'бухара': 'Bukhara', 'bukhara': 'Bukhara', 'buxoro': 'Bukhara',
+    'андижан': 'Andijan', 'andijan': 'Andijan', 'andijon': 'Andijan',
+    'фергана': 'Fergana', 'fergana': 'Fergana', "farg'ona": 'Fergana',
+    'наманган': 'Namangan', 'namangan': 'Namangan',
+}
+LOCATION_PRIORITY = {kw: i for i, kw in enumerate(LOCATION_KEYWORDS)}
+LOCATION_RE = _compile_keywords(LOCATION_KEYWORDS)
+
+# Tartib muhim: birinchi mos kelgan daraja tanlanadi
+EXPERIENCE_KEYWORDS = {
+    'no_experience': ['junior', 'джуниор', 'без опыта', 'tajribasiz', 'no experience', 'стажер', 'stajer'],
+    'between_1_and_3': ['middle', 'мидл', '1-3', '2-3 года', '1-2 yil'],
+    'between_3_and_6': ['3-6', '3-5 лет', '4-6 yil'],
+    'more_than_6': ['senior', 'сеньор', 'lead', 'тимлид', '6+', 'более 6']
+}
+EXPERIENCE_LEVELS = list(EXPERIENCE_KEYWORDS)
+EXPERIENCE_BY_KEYWORD = {
+    kw: level for level, kws in reversed(list(EXPERIENCE_KEYWORDS.items())) for kw in kws
+}
+EXPERIENCE_RE = _compile_keywords(EXPERIENCE_BY_KEYWORD)
+
+
 class TelegramVacancyScraper:
     """Telegram kanallaridan vakansiya yig'ish"""
     
@@ -33,6 +128,25 @@ class TelegramVacancyScraper:
         self.phone = phone
         self.client = None
         
+        # Bitta uzoq yashovchi client: qayta ulanish va entity keshi
+        self._connect_lock = asyncio.Lock()
+        self._entity_cache: Dict[str, object] = {}
+        
+        # Streaming (events.NewMessage) holati
+        self._stream_handler = None
+        self._channel_by_peer_id: Dict[int, str] = {}
+        
+        # FloodWait: so'rov turi ('resolve', 'history') -> qachongacha kutish (monotonic)
+        self._flood_until: Dict[str, float] = {}
+        
+        # Kanal -> oxirgi scraping statistikasi (latency, xabarlar, vakansiyalar)
+        self.channel_stats: Dict[str, Dict] = {}
+        
+        # Kanal -> bazaga saqlangan xabarlargacha tasdiqlangan watermark
+        self.channel_watermarks: Dict[str, int] = {}
+        # Kanal -> o'qilgan, lekin hali saqlanmagan eng katta xabar ID (commit_watermarks tasdiqlaydi)
+        self.pending_watermarks: Dict[str, int] = {}
+        
         # Vakansiya kanallari - Config dan olish
         try:
             from config import TELEGRAM_CHANNELS
@@ -64,6 +178,9 @@ class TelegramVacancyScraper:
             'django', 'flask', 'nodejs', 'laravel', 'wordpress', 'android', 'ios',
             'flutter', 'swift', 'kotlin', 'html', 'css', 'sql', 'postgresql', 'mongodb'
         ]
+        
+        # Barcha trigger so'zlar bitta kompilyatsiya qilingan automat (bir o'tishda tekshiriladi)
+        self._trigger_re = _compile_keywords(self.vacancy_triggers)
     
     def is_available(self) -> bool:
         """Telethon mavjudligini tekshirish"""
@@ -72,58 +189,186 @@ class TelegramVacancyScraper:
         return available
     
     async def connect(self):
-        """Telegram ga ulanish"""
+        """Telegram ga ulanish (idempotent - mavjud clientni qayta ishlatadi)"""
         if not self.is_available():
             raise Exception("Telethon o'rnatilmagan yoki API credentials yo'q")
         
+        async with self._connect_lock:
+            if self.client and self.client.is_connected():
+                return
+            
+            try:
+                if self.client is None:
+                    logger.info("Telegram ga ulanishga harakat...")
+                    self.client = TelegramClient(
+                        'vacancy_bot_session', int(self.api_id), self.api_hash,
+                        auto_reconnect=True,
+                        # Qayta ulanganda uzilish paytidagi yangilanishlarni ham olish (streaming)
+                        catch_up=True,
+                        connection_retries=5,
+                        retry_delay=2
+                    )
+                    await self.client.start(phone=self.phone)
+                    logger.info("✅ Telegram ga ulanish muvaffaqiyatli")
+                else:
+                    # Session allaqachon avtorizatsiyadan o'tgan - faqat qayta ulanish
+                    logger.info("Telegram ga qayta ulanish...")
+                    await self.client.connect()
+                    logger.info("✅ Telegram qayta ulandi")
+            except Exception as e:
+                logger.error(f"❌ Telegram ulanish xatolik: {e}", exc_info=True)
+                raise
+    
+    async def health_check(self, timeout: float = 10) -> bool:
+        """Client tirikligini tekshirish (yengil get_me so'rovi)"""
+        if not self.client or not self.client.is_connected():
+            return False
+        
         try:
-            logger.info("Telegram ga ulanishga harakat...")
-            self.client = TelegramClient('vacancy_bot_session', int(self.api_id), self.api_hash)
-            await self.client.start(phone=self.phone)
-            logger.info("✅ Telegram ga ulanish muvaffaqiyatli")
+            me = await asyncio.wait_for(self.client.get_me(), timeout=timeout)
+            return me is not None
         except Exception as e:
-            logger.error(f"❌ Telegram ulanish xatolik: {e}", exc_info=True)
-            raise
+            logger.warning(f"⚠️ Telegram health check muvaffaqiyatsiz: {e}")
+            return False
+    
+    async def ensure_connected(self):
+        """Ulanish tirik ekanini ta'minlash, kerak bo'lsa qayta ulanish"""
+        if await self.health_check():
+            return
+        
+        if self.client and self.client.is_connected():
+            # Ulanish osilib qolgan - uzib, qayta ulanamiz
+            try:
+                await self.client.disconnect()
+            except Exception as e:
+                logger.debug(f"Stale disconnect xatolik: {e}")
+        
+        await self.connect()
+    
+    async def _call_with_flood_wait(self, kind: str, call: Callable[[], Awaitable], retries: int = 2):
+        """So'rovni FloodWait ni hisobga olib bajarish
+        
+        FloodWaitError kelsa, faqat shu turdagi (`kind`) so'rovlar pauza qilinadi -
+        boshqa turdagi ishlar davom etaveradi.
+        """
+        for attempt in range(retries + 1):
+            wait = self._flood_until.get(kind, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            
+            try:
+                return await call()
+            except FloodWaitError as e:
+                until = time.monotonic() + e.seconds + 1
+                self._flood_until[kind] = max(self._flood_until.get(kind, 0), until)
+                logger.warning(f"⏳ FloodWait ({kind}): {e.seconds}s kutish (urinish {attempt + 1})")
+                if attempt >= retries:
+                    raise
+    
+    async def get_channel_entity(self, channel: str):
+        """Kanal entity sini keshdan olish yoki bir marta resolve qilish"""
+        entity = self._entity_cache.get(channel)
+        if entity is None:
+            entity = await self._call_with_flood_wait(
+                'resolve', lambda: self.client.get_input_entity(channel)
+            )
+            self._entity_cache[channel] = entity
+        return entity
     
     async def disconnect(self):
-        """Uzilish"""
+        """Uzilish (faqat bot to'xtaganda chaqiriladi)"""
         if self.client:
             try:
                 await self.client.disconnect()
                 logger.info("Telegram disconnect")
             except Exception as e:
                 logger.error(f"Disconnect xatolik: {e}")
+            finally:
+                self.client = None
+                self._stream_handler = None
+                self._entity_cache.clear()
     
-    def is_vacancy_message(self, text: str) -> bool:
-        """Xabar vakansiya ekanligini aniqlash"""
-        if not text or len(text) < 20:
+    async def start_streaming(self, on_vacancy: Callable[[Dict], Awaitable[None]]) -> bool:
+        """Kanallardagi yangi postlarga obuna bo'lish (push rejimi)
+        
+        Har bir yangi post kelishi bilan parse qilinadi va vakansiya bo'lsa
+        `on_vacancy(vacancy)` chaqiriladi. Streaming polling watermarkiga tegmaydi:
+        stream ko'rmagan xabarlar (restart, uzilish) orasida bo'lishi mumkin, ularni
+        polling watermarkdan boshlab o'qiydi (streamda kelganlari - `unchanged`).
+        """
+        if not self.client:
+            logger.error("Telegram client yo'q - ensure_connected() chaqiring")
             return False
         
-        text_lower = text.lower()
+        if self._stream_handler:
+            return True
         
-        # Exclude keywords (spam, reklama)
-        exclude_keywords = [
-            'купить', 'продать', 'продаю', 'куплю', 'sotish', 'sotaman',
-            'reklama', 'advertisement', 'акция', 'скидка', 'chegirma'
-        ]
+        # Entitylarni resolve qilish: peer_id -> config dagi kanal nomi
+        chats = []
+        for channel in self.vacancy_channels:
+            try:
+                entity = await self.get_channel_entity(channel)
+                self._channel_by_peer_id[telethon_utils.get_peer_id(entity)] = channel
+                chats.append(entity)
+            except Exception as e:
+                logger.error(f"   ❌ Kanal {channel} resolve xatolik: {e}")
         
-        for exclude in exclude_keywords:
-            if exclude in text_lower:
-                return False
+        if not chats:
+            logger.warning("Streaming uchun birorta ham kanal resolve qilinmadi")
+            return False
         
-        # Trigger so'zlar bormi?
-        triggers_found = 0
-        for trigger in self.vacancy_triggers:
-            if trigger in text_lower:
-                triggers_found += 1
-                if triggers_found >= 2:  # Kamida 2 ta trigger
-                    return True
+        async def handler(event):
+            try:
+                channel = self._channel_by_peer_id.get(event.chat_id)
+                message = event.message
+                if not channel or not message:
+                    return
+                
+                # Polling watermarki siljitilmaydi - oraliqdagi xabarlarni polling o'qiydi
+                if not message.text:
+                    return
+                
+                vacancy = self.parse_vacancy_from_text(message.text, channel, message.id, message.date)
+                if vacancy:
+                    await on_vacancy(vacancy)
+            except Exception as e:
+                logger.error(f"Streaming handler xatolik: {e}")
         
-        return triggers_found >= 1  # Yoki 1 ta trigger + uzun matn
+        self.client.add_event_handler(handler, events.NewMessage(chats=chats))
+        self._stream_handler = handler
+        logger.info(f"📡 Telegram streaming yoqildi: {len(chats)} ta kanal")
+        return True
+    
+    def stop_streaming(self):
+        """NewMessage obunasini bekor qilish"""
+        if self.client and self._stream_handler:
+            self.client.remove_event_handler(self._stream_handler)
+            logger.info("📡 Telegram streaming o'chirildi")
+        self._stream_handler = None
+    
+    def _is_vacancy_lower(self, text_lower: str) -> bool:
+        """Kichik harfli matn bo'yicha klassifikatsiya (2 ta regex o'tishi)"""
+        # Exclude keywords (spam, reklama)
+        if EXCLUDE_RE.search(text_lower):
+            return False
+        
+        # Kamida bitta trigger so'z bo'lishi kerak
+        return self._trigger_re.search(text_lower) is not None
+    
+    def is_vacancy_message(self, text: str) -> bool:
+        """Xabar vakansiya ekanligini aniqlash"""
+        if not text or len(text) < 20:
+            return False
+        
+        return self._is_vacancy_lower(text.lower())
     
     def parse_vacancy_from_text(self, text: str, channel_name: str, message_id: int, date) -> Optional[Dict]:
         """Xabar matnidan vakansiyani parse qilish"""
-        if not self.is_vacancy_message(text):
+        if not text or len(text) < 20:
+            return None
+        
+        text_lower = text.lower()
+        if not self._is_vacancy_lower(text_lower):
             return None
         
         logger.debug(f"Parsing vacancy from {channel_name}/{message_id}")
@@ -133,11 +378,11 @@ class TelegramVacancyScraper:
         title = lines[0] if lines else 'Vakansiya'
         
         # Emoji va keraksiz belgilarni tozalash
-        title = re.sub(r'[#️⃣🔴🔵⚡️💼📌🔥✅❗️⭕️🟢🔴🟡⚪️💎🎯🚀📢🔔]', '', title).strip()
+        title = EMOJI_RE.sub('', title).strip()
         
         # Title juda qisqa bo'lsa, ikkinchi qatorni ham qo'shish
         if len(title) < 15 and len(lines) > 1:
-            second_line = re.sub(r'[#️⃣🔴🔵⚡️💼📌🔥✅❗️⭕️🟢🔴🟡⚪️💎🎯🚀📢🔔]', '', lines[1]).strip()
+            second_line = EMOJI_RE.sub('', lines[1]).strip()
             title = f"{title} {second_line}"
         
         title = title[:150]  # Max 150 belgi
@@ -147,17 +392,13 @@ class TelegramVacancyScraper:
         
         # Kompaniya topish
         company = 'Noma\'lum'
-        company_patterns = [
-            r'(?:компания|company|firma|kompaniya|tashkilot)[:\s]+([^\n]{3,100})',
-            r'(?:в компании|at company|da)[:\s]+([^\n]{3,100})',
-            r'(?:фирма|firm)[:\s]+([^\n]{3,100})'
-        ]
-        
-        for pattern in company_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        same_length = len(text_lower) == len(text)
+        for pattern in COMPANY_RES:
+            match = pattern.search(text_lower)
             if match:
-                company = match.group(1).strip()[:100]
-                company = re.sub(r'[#️⃣🔴🔵⚡️💼📌🔥✅❗️⭕️🟢🔴🟡⚪️💎🎯🚀📢🔔]', '', company).strip()
+                start, end = match.span(1)
+                company = (text[start:end] if same_length else match.group(1)).strip()[:100]
+                company = EMOJI_RE.sub('', company).strip()
                 if company:
                     break
         
@@ -165,17 +406,8 @@ class TelegramVacancyScraper:
         salary_min = None
         salary_max = None
         
-        salary_patterns = [
-            r'(\d+)\s*[-–—]\s*(\d+)\s*(?:млн|mln|million|миллион)?',
-            r'(?:от|dan|from)\s+(\d+)',
-            r'(?:до|gacha|to)\s+(\d+)',
-            r'(?:зп|maosh|salary)[:\s]+(\d+)',
-            r'(\d+)\s*(?:млн|mln)',
-            r'(?:зарплата|oylik)[:\s]+(\d+)',
-        ]
-        
-        for pattern in salary_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in SALARY_RES:
+            match = pattern.search(text_lower)
             if match:
                 try:
                     nums = [int(n.replace(' ', '').replace(',', '')) for n in match.groups() if n]
@@ -189,36 +421,17 @@ class TelegramVacancyScraper:
                 except:
                     pass
         
-        # Joylashuv topish
+        # Joylashuv topish (bitta o'tish, eng yuqori ustuvorlikdagi shahar)
         location = 'Tashkent'
-        location_keywords = {
-            'ташкент': 'Tashkent', 'tashkent': 'Tashkent', 'toshkent': 'Tashkent',
-            'самарканд': 'Samarkand', 'samarkand': 'Samarkand', 'samarqand': 'Samarkand',
-            'бухара': 'Bukhara', 'bukhara': 'Bukhara', 'buxoro': 'Bukhara',
-            'андижан': 'Andijan', 'andijan': 'Andijan', 'andijon': 'Andijan',
-            'фергана': 'Fergana', 'fergana': 'Fergana', "farg'ona": 'Fergana',
-            'наманган': 'Namangan', 'namangan': 'Namangan',
-        }
+        found_locations = set(LOCATION_RE.findall(text_lower))
+        if found_locations:
+            location = LOCATION_KEYWORDS[min(found_locations, key=LOCATION_PRIORITY.__getitem__)]
         
-        text_lower = text.lower()
-        for keyword, city in location_keywords.items():
-            if keyword in text_lower:
-                location = city
-                break
-        
-        # Tajriba
+        # Tajriba (bitta o'tish, birinchi mos daraja)
         experience_level = 'not_specified'
-        exp_keywords = {
-            'no_experience': ['junior', 'джуниор', 'без опыта', 'tajribasiz', 'no experience', 'стажер', 'stajer'],
-            'between_1_and_3': ['middle', 'мидл', '1-3', '2-3 года', '1-2 yil'],
-            'between_3_and_6': ['3-6', '3-5 лет', '4-6 yil'],
-            'more_than_6': ['senior', 'сеньор', 'lead', 'тимлид', '6+', 'более 6']
-        }
-        
-        for level, keywords in exp_keywords.items():
-            if any(kw in text_lower for kw in keywords):
-                experience_level = level
-                break
+        found_levels = {EXPERIENCE_BY_KEYWORD[kw] for kw in EXPERIENCE_RE.findall(text_lower)}
+        if found_levels:
+            experience_level = min(found_levels, key=EXPERIENCE_LEVELS.index)
         
         # URL
         url = f"https://t.me/{channel_name.replace('@', '')}/{message_id}"
@@ -252,62 +465,158 @@ class TelegramVacancyScraper:
         logger.info(f"✅ Telegram vakansiya: {title[:50]} from {channel_name}")
         return vacancy
     
-    async def scrape_channels(self, limit_per_channel: int = 30) -> List[Dict]:
-        """Kanallardan vakansiyalarni yig'ish"""
+    async def _scrape_channel(self, channel: str, last_id: int,
+                              limit_per_channel: int, max_new_per_channel: int) -> List[Dict]:
+        """Bitta kanaldan yangi xabarlarni olish va parse qilish"""
+        started = time.monotonic()
+        
+        entity = await self.get_channel_entity(channel)
+        
+        async def fetch():
+            if last_id:
+                # Inkremental: watermarkdan keyingi xabarlar, eskisidan yangisiga
+                iterator = self.client.iter_messages(
+                    entity, min_id=last_id, limit=max_new_per_channel, reverse=True
+                )
+            else:
+                # Backfill: yangi kanal uchun oxirgi N ta xabar
+                iterator = self.client.iter_messages(entity, limit=limit_per_channel)
+            return [message async for message in iterator]
+        
+        logger.info(f"📱 Kanal scraping: {channel} ({f'min_id={last_id}' if last_id else f'backfill={limit_per_channel}'})")
+        fetched = await self._call_with_flood_wait('history', fetch)
+        fetch_latency = time.monotonic() - started
+        
+        # Parse qilish - butun batch parsing poolga yuboriladi
+        messages = [m for m in fetched if m.text]
+        batch = [(msg.text, channel, msg.id, msg.date) for msg in messages]
+        vacancies = await run_parser(parse_message_batch, batch) if batch else []
+        
+        # Matnsiz xabarlar ham watermarkni siljitadi - lekin faqat parse va saqlashdan keyin (commit_watermarks)
+        max_seen_id = max([m.id for m in fetched] + [last_id])
+        if max_seen_id > last_id:
+            self.pending_watermarks[channel] = max(max_seen_id, self.pending_watermarks.get(channel, 0))
+        
+        self.channel_stats[channel] = {
+            'fetch_latency': round(fetch_latency, 3),
+            'messages': len(messages),
+            'vacancies': len(vacancies),
+        }
+        logger.info(
+            f"   ✅ {channel}: {len(messages)} ta xabar, {len(vacancies)} ta vakansiya "
+            f"({fetch_latency:.2f}s)"
+        )
+        return vacancies
+    
+    @staticmethod
+    def vacancy_message_ref(vacancy: Dict) -> Optional[tuple]:
+        """tg_{kanal}_{message_id} -> (kanal, message_id)"""
+        external_id = str(vacancy.get('external_id') or '')
+        if not external_id.startswith('tg_'):
+            return None
+        channel, _, message_id = external_id[3:].rpartition('_')
+        try:
+            return channel, int(message_id)
+        except ValueError:
+            return None
+
+    def _failed_floor(self, failed: List[Dict]) -> Dict[str, int]:
+        """Kanal -> saqlanmagan eng kichik xabar ID"""
+        blocked: Dict[str, int] = {}
+        for vacancy in failed or []:
+            ref = self.vacancy_message_ref(vacancy)
+            if ref:
+                channel, message_id = ref
+                blocked[channel] = min(message_id, blocked.get(channel, message_id))
+        return blocked
+
+    def _advance(self, candidates: Dict[str, int], blocked: Dict[str, int]) -> Dict[str, int]:
+        committed = {}
+        for channel, seen_id in candidates.items():
+            safe_id = min(seen_id, blocked[channel] - 1) if channel in blocked else seen_id
+            if safe_id > self.channel_watermarks.get(channel, 0):
+                self.channel_watermarks[channel] = safe_id
+                committed[channel] = safe_id
+        return committed
+
+    def commit_watermarks(self, failed: List[Dict] = None) -> Dict[str, int]:
+        """O'qilgan xabarlar watermarkini tasdiqlash (saqlanmagan vakansiyalardan oldingacha)
+
+        Saqlab bo'lmagan vakansiya bo'lsa, kanal watermarki undan bitta oldingi
+        xabargacha siljiydi - keyingi sikl o'sha xabardan boshlab qayta o'qiydi.
+        Qaytaradi: {kanal: watermark} - faqat oldinga siljiganlari (saqlash uchun).
+        """
+        committed = self._advance(self.pending_watermarks, self._failed_floor(failed))
+        self.pending_watermarks.clear()
+        return committed
+
+    async def scrape_channels(self, limit_per_channel: int = 30,
+                              watermarks: Dict[str, int] = None,
+                              max_new_per_channel: int = 200,
+                              concurrency: int = 5) -> List[Dict]:
+        """Kanallardan vakansiyalarni yig'ish (watermark bo'yicha inkremental)
+        
+        watermarks - {kanal: oxirgi ko'rilgan xabar ID}. Watermarki bor kanaldan
+        faqat undan keyingi xabarlar olinadi (min_id). Watermarki yo'q (yangi)
+        kanal uchun backfill: oxirgi `limit_per_channel` ta xabar olinadi.
+        O'qilgan xabarlar `self.pending_watermarks` da qoladi - vakansiyalar saqlangach
+        `commit_watermarks(failed)` bilan tasdiqlanadi.
+        Kanallar parallel (`concurrency` tadan) scraping qilinadi.
+        """
         if not self.is_available():
             logger.error("Telethon mavjud emas")
             return []
         
         if not self.client:
-            logger.error("Telegram client yo'q - connect() chaqiring")
+            logger.error("Telegram client yo'q - ensure_connected() chaqiring")
             return []
         
-        vacancies = []
+        watermarks = watermarks or {}
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        started = time.monotonic()
         
-        for channel in self.vacancy_channels:
-            try:
-                logger.info(f"📱 Kanal scraping: {channel}")
-                
-                # Oxirgi xabarlarni olish
-                messages = []
+        async def run(channel: str) -> List[Dict]:
+            async with semaphore:
                 try:
-                    async for message in self.client.iter_messages(channel, limit=limit_per_channel):
-                        if message.text:
-                            messages.append(message)
+                    return await self._scrape_channel(
+                        channel, watermarks.get(channel, 0),
+                        limit_per_channel, max_new_per_channel
+                    )
                 except Exception as e:
-                    logger.error(f"   ❌ Kanal {channel} dan xabar olishda xatolik: {e}")
-                    continue
-                
-                logger.info(f"   {channel}: {len(messages)} ta xabar topildi")
-                
-                # Parse qilish
-                parsed_count = 0
-                for msg in messages:
-                    try:
-                        vacancy = self.parse_vacancy_from_text(
-                            msg.text,
-                            channel,
-                            msg.id,
-                            msg.date
-                        )
-                        
-                        if vacancy:
-                            vacancies.append(vacancy)
-                            parsed_count += 1
-                    except Exception as e:
-                        logger.debug(f"   Parse error: {e}")
-                        continue
-                
-                logger.info(f"   ✅ {channel}: {parsed_count} ta vakansiya parse qilindi")
-                
-            except Exception as e:
-                logger.error(f"   ❌ Kanal {channel} scraping xatolik: {e}")
-                continue
+                    logger.error(f"   ❌ Kanal {channel} scraping xatolik: {e}")
+                    return []
         
-        logger.info(f"📱 Telegram: Jami {len(vacancies)} ta vakansiya topildi")
+        results = await asyncio.gather(*[run(channel) for channel in self.vacancy_channels])
+        vacancies = [v for channel_vacancies in results for v in channel_vacancies]
+        
+        logger.info(
+            f"📱 Telegram: Jami {len(vacancies)} ta vakansiya topildi "
+            f"({len(self.vacancy_channels)} kanal, {time.monotonic() - started:.2f}s)"
+        )
         return vacancies
 
 
+# Parsing pool workerlari uchun credentialsiz parser (faqat parse metodlari ishlatiladi)
+_batch_parser: Optional[TelegramVacancyScraper] = None
+
+
+def parse_message_batch(batch: List[tuple]) -> List[Dict]:
+    """(text, channel, message_id, date) lar ro'yxatini parse qilish"""
+    global _batch_parser
+    if _batch_parser is None:
+        _batch_parser = TelegramVacancyScraper()
+    
+    vacancies = []
+    for text, channel, message_id, date in batch:
+        try:
+            vacancy = _batch_parser.parse_vacancy_from_text(text, channel, message_id, date)
+            if vacancy:
+                vacancies.append(vacancy)
+        except Exception as e:
+            logger.debug(f"   Parse error: {e}")
+    return vacancies
+
+
 # Global instance (agar config bor bo'lsa)
 telegram_scraper = None
 
@@ -1,6 +1,6 @@
-import aiohttp
 import logging
 from config import GROK_API_KEY
+from utils.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -40,28 +40,28 @@ class GrokProvider:
         prompt = f"REZYUME:\n{resume_text}\n\nMAQSAD: {target_goal}"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                payload = {
-                    "model": "grok-4-1-fast-reasoning", 
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "stream": False
-                }
-                
-                async with session.post(self.api_url, headers=headers, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data['choices'][0]['message']['content']
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Grok API Error: {response.status} - {error_text}")
-                        return "AI tahlilida xatolik yuz berdi. Iltimos keyinroq urinib ko'ring."
+            session = await http_client.get_session()
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+            payload = {
+                "model": "grok-4-1-fast-reasoning", 
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                "stream": False
+            }
+            
+            async with session.post(self.api_url, headers=headers, json=payload) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data['choices'][0]['message']['content']
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Grok API Error: {response.status} - {error_text}")
+                    return "AI tahlilida xatolik yuz berdi. Iltimos keyinroq urinib ko'ring."
         except Exception as e:
             logger.error(f"Grok Exception: {e}")
             return f"Xatolik: {str(e)}"
@@ -0,0 +1,84 @@
+"""
+Circuit breaker - ketma-ket xatoliklardan keyin manbaga so'rovlarni vaqtincha to'xtatish
+
+Holatlar:
+- closed    - oddiy ish, so'rovlar o'tadi;
+- open      - `failure_threshold` ta ketma-ket xatolikdan keyin, `reset_timeout`
+              davomida barcha so'rovlar darhol rad etiladi (fast-fail);
+- half_open - muddat o'tgach bitta sinov (probe) so'rovi o'tkaziladi: muvaffaqiyatli
+              bo'lsa - closed, aks holda yana open. Natijasiz tugagan (bekor qilingan)
+              probe `release_probe` bilan slotni bo'shatadi.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Manba bo'yicha circuit breaker"""
+
+    def __init__(self, name: str, failure_threshold: int = 3,
+                 reset_timeout: float = 60.0, probe_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None
+
+        self.stats = {'rejected': 0, 'opened': 0}
+
+    def allow_request(self) -> bool:
+        """So'rov o'tkazilishi mumkinmi?"""
+        now = time.monotonic()
+
+        if self.state == STATE_OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                self.stats['rejected'] += 1
+                return False
+            self.state = STATE_HALF_OPEN
+            self._probe_started_at = None
+            logger.info(f"🔌 {self.name}: circuit half-open, sinov so'rovi")
+
+        if self.state == STATE_HALF_OPEN:
+            # Bir vaqtda faqat bitta probe (osilib qolgan probe - probe_timeout dan keyin almashtiriladi)
+            if self._probe_started_at is not None and now - self._probe_started_at < self.probe_timeout:
+                self.stats['rejected'] += 1
+                return False
+            self._probe_started_at = now
+
+        return True
+
+    def record_success(self):
+        if self.state != STATE_CLOSED:
+            logger.info(f"🔌 {self.name}: circuit closed")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probe_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                self.stats['opened'] += 1
+                logger.warning(
+                    f"🔌 {self.name}: circuit open ({self.failures} ta ketma-ket xatolik), "
+                    f"{self.reset_timeout:.0f}s fast-fail"
+                )
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+            self._probe_started_at = None
+
+    def release_probe(self):
+        """Natija qayd etilmagan probe slotini bo'shatish (masalan, so'rov bekor qilinganda)"""
+        if self.state == STATE_HALF_OPEN:
+            self._probe_started_at = None
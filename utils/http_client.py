@@ -0,0 +1,111 @@
+"""
+Umumiy HTTP client - barcha tashqi so'rovlar uchun bitta connection pool
+
+hh.uz, UzJobs va Grok so'rovlari bitta aiohttp session orqali o'tadi:
+- keep-alive - har bir so'rovda qayta TCP/TLS handshake qilinmaydi;
+- ttl_dns_cache - DNS javoblari keshlanadi;
+- host bo'yicha ulanishlar cheklovi (limit_per_host);
+- gzip/deflate (Brotli o'rnatilgan bo'lsa br ham) - aiohttp avtomatik;
+- host bo'yicha kechikish va xatoliklar statistikasi (TraceConfig orqali).
+"""
+
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+import aiohttp
+
+from config import HTTP_POOL_LIMIT, HTTP_LIMIT_PER_HOST, HTTP_DNS_TTL, HTTP_KEEPALIVE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """Lazy yaratiladigan umumiy aiohttp session"""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10,
+                 dns_ttl: int = 300, keepalive_timeout: float = 30.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.host_stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {'requests': 0, 'errors': 0, 'latency_total': 0.0, 'latency_max': 0.0}
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Sessionni qaytarish (yopilgan bo'lsa qayta yaratish)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self._trace_config()],
+            )
+            logger.info(
+                f"✅ HTTP pool yaratildi (limit={self.limit}, per_host={self.limit_per_host}, "
+                f"dns_ttl={self.dns_ttl}s)"
+            )
+        return self._session
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Har bir so'rovning kechikishi va natijasini host bo'yicha yozish"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.started_at = time.monotonic()
+
+        async def on_request_end(session, ctx, params):
+            self._record(params.url.host, ctx, error=params.response.status >= 400)
+
+        async def on_request_exception(session, ctx, params):
+            self._record(params.url.host, ctx, error=True)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+    def _record(self, host: Optional[str], ctx, error: bool):
+        latency = time.monotonic() - getattr(ctx, 'started_at', time.monotonic())
+        stats = self.host_stats[host or 'unknown']
+        stats['requests'] += 1
+        stats['latency_total'] += latency
+        stats['latency_max'] = max(stats['latency_max'], latency)
+        if error:
+            stats['errors'] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Host bo'yicha qisqa statistika (o'rtacha kechikish ms da)"""
+        return {
+            host: {
+                'requests': int(s['requests']),
+                'errors': int(s['errors']),
+                'avg_ms': round(s['latency_total'] / s['requests'] * 1000, 1) if s['requests'] else 0.0,
+                'max_ms': round(s['latency_max'] * 1000, 1),
+            }
+            for host, s in self.host_stats.items()
+        }
+
+    async def close(self):
+        """Sessionni yopish (on_shutdown da)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            for host, s in self.get_stats().items():
+                logger.info(f"HTTP {host}: {s['requests']} so'rov, {s['errors']} xato, o'rtacha {s['avg_ms']}ms")
+        self._session = None
+
+
+http_client = HttpClient(
+    limit=HTTP_POOL_LIMIT,
+    limit_per_host=HTTP_LIMIT_PER_HOST,
+    dns_ttl=HTTP_DNS_TTL,
+    keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+)
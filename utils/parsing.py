@@ -0,0 +1,94 @@
+"""
+Parsing bosqichi - og'ir parse ishlarini event loop dan tashqariga chiqarish
+
+BeautifulSoup (UzJobs) va regex (Telegram) parse qilish aiogram polling bilan
+bitta event loopda ishlasa, har bir scraping sikli tugma bosishlarga kechikish
+qo'shadi. Bu modul parse funksiyalarini process (yoki thread) poolga yuboradi
+va oddiy dict larni qaytaradi. Pool ishlamasa - inline parse qilinadi.
+"""
+
+import asyncio
+import logging
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[Executor] = None
+_executor_disabled = False
+
+
+def _get_executor() -> Optional[Executor]:
+    """Poolni lazy yaratish (PARSE_EXECUTOR / PARSE_WORKERS bo'yicha)"""
+    global _executor, _executor_disabled
+
+    if _executor is not None or _executor_disabled:
+        return _executor
+
+    try:
+        from config import PARSE_EXECUTOR, PARSE_WORKERS
+    except Exception:
+        PARSE_EXECUTOR, PARSE_WORKERS = 'process', 2
+
+    if PARSE_EXECUTOR == 'inline' or PARSE_WORKERS <= 0:
+        _executor_disabled = True
+        logger.info("Parsing: inline rejim")
+        return None
+
+    try:
+        if PARSE_EXECUTOR == 'thread':
+            _executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix='parse')
+        else:
+            _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        logger.info(f"✅ Parsing pool yaratildi ({PARSE_EXECUTOR}, workers={PARSE_WORKERS})")
+    except Exception as e:
+        logger.error(f"❌ Parsing pool yaratilmadi, inline rejim: {e}")
+        _executor_disabled = True
+
+    return _executor
+
+
+async def run_parser(func: Callable, *args) -> Any:
+    """Parse funksiyasini poolda bajarish
+
+    `func` modul darajasidagi (pickle qilinadigan) funksiya bo'lishi kerak.
+    Inline ga faqat pool ishlamay qolganda qaytiladi (worker o'ldi, pool yopilgan,
+    funksiya/argumentlar pickle qilinmadi). Parserning o'z xatoliklari chaqiruvchiga
+    uzatiladi - bir xil kirishni loopda qayta parse qilmaslik uchun.
+    """
+    global _executor, _executor_disabled
+
+    executor = _get_executor()
+    if executor is not None:
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(executor, func, *args)
+        except RuntimeError as e:
+            # Pool yopilgan (shutdown) - yangi vazifa qabul qilmaydi
+            logger.error(f"❌ Parsing pool yopilgan, inline rejimga o'tildi: {e}")
+            _executor = None
+            _executor_disabled = True
+            return func(*args)
+        try:
+            return await future
+        except BrokenProcessPool as e:
+            # Worker o'ldi - poolni tashlab, inline rejimga o'tamiz
+            logger.error(f"❌ Parsing pool buzildi, inline rejimga o'tildi: {e}")
+            _executor = None
+            _executor_disabled = True
+        except pickle.PicklingError as e:
+            # Vazifani workerga yuborib bo'lmadi - parse hali bajarilmagan
+            logger.warning(f"⚠️ {func.__name__} poolga yuborilmadi, inline parse: {e}")
+
+    return func(*args)
+
+
+def shutdown_parse_pool():
+    """Poolni yopish (on_shutdown da)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("Parsing pool yopildi")
@@ -0,0 +1,161 @@
+"""
+Adaptiv token-bucket rate limiter
+
+Tashqi API (hh.uz) ga boradigan barcha so'rovlar bitta bucket orqali o'tadi:
+- 429/403 yoki Retry-After kelsa tezlik kamaytiriladi (multiplicative decrease)
+  va bucket Retry-After muddatiga (soniya yoki HTTP-date) to'xtatiladi;
+- muvaffaqiyatli javoblardan keyin tezlik asta-sekin tiklanadi (additive increase);
+- interaktiv (user qidiruvi) so'rovlar navbatda fon so'rovlardan oldin turadi;
+  navbatdagi fon so'rovini `promote(ticket)` bilan interaktivga ko'tarish mumkin.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class RequestTicket:
+    """Bitta (ehtimol bir nechta chaqiruvchi kutayotgan) so'rovning ustuvorligi"""
+
+    __slots__ = ('interactive', 'entry')
+
+    def __init__(self, interactive: bool = False):
+        self.interactive = interactive
+        self.entry = None  # navbatdagi (priority, seq, future)
+
+
+class AdaptiveRateLimiter:
+    """Ustuvorlikli navbatga ega adaptiv token bucket"""
+
+    def __init__(self, name: str, rate: float = 5.0, burst: int = 5,
+                 min_rate: float = 0.5, recover_step: float = 0.1):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.recover_step = recover_step
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self.stats = {'granted': 0, 'throttled': 0}
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, interactive: bool = False, ticket: Optional[RequestTicket] = None):
+        """Token olish (kerak bo'lsa navbatda kutish)
+
+        ticket berilsa ustuvorlik undan olinadi va kutish davomida `promote` qilinishi mumkin.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if ticket is not None:
+            interactive = ticket.interactive
+        priority = PRIORITY_INTERACTIVE if interactive else PRIORITY_BACKGROUND
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        if ticket is not None:
+            ticket.entry = entry
+
+        self._ensure_dispatcher()
+        try:
+            await future
+        finally:
+            if ticket is not None:
+                ticket.entry = None
+
+    def promote(self, ticket: RequestTicket):
+        """So'rovni interaktiv ustuvorlikka ko'tarish (navbatda kutayotgan bo'lsa - darhol)"""
+        if ticket.interactive:
+            return
+        ticket.interactive = True
+        entry = ticket.entry
+        if entry is not None and not entry[2].done():
+            # Eski yozuv navbatda qoladi - future bajarilgach dispatcher uni tashlab yuboradi
+            promoted = (PRIORITY_INTERACTIVE, entry[1], entry[2])
+            heapq.heappush(self._waiters, promoted)
+            ticket.entry = promoted
+            self._ensure_dispatcher()
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        """Navbatdagilarga tokenlarni ustuvorlik tartibida tarqatish"""
+        while self._waiters:
+            # Bekor qilingan kutuvchilarni tashlab yuborish
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                _, _, future = heapq.heappop(self._waiters)
+                future.set_result(None)
+                self.stats['granted'] += 1
+                continue
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_response(self, status: int, retry_after: Optional[str] = None):
+        """Javob statusiga qarab tezlikni moslashtirish"""
+        if status in (429, 403) or retry_after:
+            self.stats['throttled'] += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0
+
+            pause = self._parse_retry_after(retry_after)
+            if pause is None:
+                pause = 1 / self.rate
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            logger.warning(
+                f"⏳ {self.name}: status={status}, tezlik {self.rate:.2f} req/s ga tushirildi, "
+                f"{pause:.1f}s pauza"
+            )
+        elif 200 <= status < 300 and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.recover_step)
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After ni o'qish: soniyalar yoki HTTP-date (o'qib bo'lmasa - None, standart pauza)"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if retry_at is None:
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
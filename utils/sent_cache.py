@@ -0,0 +1,120 @@
+"""
+Yuborilgan alertlar keshi - user bo'yicha Bloom filter
+
+Har bir user uchun yuborilgan vakansiyalarning butun sonli kalitlari
+(vacancies.id) ixcham Bloom filterda saqlanadi:
+- filter "yo'q" desa - vakansiya aniq yuborilmagan (bazaga so'rov kerak emas);
+- filter "bor" desa - ehtimol yuborilgan, bazadan tekshiriladi (false positive).
+
+Filter to'lib qolsa (capacity dan oshsa) user keshdan chiqariladi va keyingi
+safar bazadan kattaroq hajm bilan qayta yuklanadi. Userlar soni LRU bilan cheklangan.
+"""
+
+import logging
+import math
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from config import SENT_CACHE_MAX_USERS, SENT_CACHE_ERROR_RATE
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x: int) -> int:
+    """splitmix64 finalizer - butun sonni tasodifiy ko'rinishdagi 64 bitga aylantirish"""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class BloomFilter:
+    """Butun sonli kalitlar uchun oddiy Bloom filter (bytearray ustida)"""
+
+    __slots__ = ('capacity', 'size', 'hashes', 'count', 'bits')
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.size = max(64, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: int):
+        # Double hashing: h1 + i * h2
+        h1 = _mix64(key)
+        h2 = _mix64(h1) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: int):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SentVacancyCache:
+    """User -> Bloom filter (LRU bilan cheklangan)"""
+
+    def __init__(self, max_users: int = 5000, error_rate: float = 0.01, min_capacity: int = 256):
+        self.max_users = max_users
+        self.error_rate = error_rate
+        self.min_capacity = min_capacity
+        self._filters: "OrderedDict[int, BloomFilter]" = OrderedDict()
+        self.stats = {'memory': 0, 'db_checks': 0, 'false_positives': 0, 'loads': 0, 'evictions': 0}
+
+    def missing(self, user_ids: Iterable[int]) -> List[int]:
+        """Keshda hali yuklanmagan userlar"""
+        return [u for u in dict.fromkeys(user_ids) if u not in self._filters]
+
+    def load(self, user_id: int, keys: List[int]):
+        """User filterini bazadagi kalitlardan qurish (o'sish uchun 2x zaxira bilan)"""
+        bloom = BloomFilter(max(self.min_capacity, len(keys) * 2), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        self._filters[user_id] = bloom
+        self._filters.move_to_end(user_id)
+        self.stats['loads'] += 1
+        while len(self._filters) > self.max_users:
+            self._filters.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def might_contain(self, user_id: int, key: int) -> Optional[bool]:
+        """False - aniq yuborilmagan, True - ehtimol yuborilgan, None - user keshda yo'q"""
+        bloom = self._filters.get(user_id)
+        if bloom is None:
+            return None
+        self._filters.move_to_end(user_id)
+        if key in bloom:
+            self.stats['db_checks'] += 1
+            return True
+        self.stats['memory'] += 1
+        return False
+
+    def add(self, user_id: int, key: int):
+        """Yangi yuborilgan kalitni qo'shish (user yuklanmagan bo'lsa - bazadan keyin yuklanadi)"""
+        bloom = self._filters.get(user_id)
+        if bloom is None:
+            return
+        bloom.add(key)
+        if bloom.count > bloom.capacity:
+            # To'lgan filterda false positive ko'payadi - keyingi safar qayta quriladi
+            del self._filters[user_id]
+
+    def discard(self, user_id: int):
+        self._filters.pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            'users': len(self._filters),
+            'bytes': sum(len(b.bits) for b in self._filters.values()),
+        }
+
+
+sent_cache = SentVacancyCache(max_users=SENT_CACHE_MAX_USERS, error_rate=SENT_CACHE_ERROR_RATE)
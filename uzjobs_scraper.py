@@ -1,11 +1,19 @@
-import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timezone
 import logging
 import re
 import random
+import time
+from config import (
+    UZJOBS_BREAKER_THRESHOLD, UZJOBS_BREAKER_COOLDOWN, UZJOBS_BACKGROUND_DEADLINE,
+    UZJOBS_CACHE_TTL, UZJOBS_CACHE_STALE_TTL,
+)
+from utils.circuit_breaker import CircuitBreaker
+from utils.http_client import http_client
+from utils.parsing import run_parser
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +27,104 @@ class UzJobsScraper:
         }
         # Global semaphore to ensure only one request happens at a time across all instances
         self.semaphore = asyncio.Semaphore(1)
+        # Ketma-ket xatoliklarda UzJobs ga so'rovlarni vaqtincha to'xtatish
+        self.breaker = CircuitBreaker(
+            'UzJobs',
+            failure_threshold=UZJOBS_BREAKER_THRESHOLD,
+            reset_timeout=UZJOBS_BREAKER_COOLDOWN,
+        )
+        
+        # Natijalar keshi (LRU + TTL, stale-while-revalidate) - user qidiruvi va fon scraping uchun umumiy
+        self.cache_ttl = UZJOBS_CACHE_TTL
+        self.cache_stale_ttl = max(UZJOBS_CACHE_STALE_TTL, UZJOBS_CACHE_TTL)
+        self.cache_max_entries = 200
+        self._result_cache: "OrderedDict[Tuple[str, ...], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, ...], asyncio.Task] = {}
+        self.cache_stats = {'hits': 0, 'stale': 0, 'misses': 0, 'coalesced': 0}
 
-    async def scrape_uzjobs(self, keywords: List[str] = None) -> List[Dict]:
-        """uzjobs.com dan vakansiyalarni yig'ish - OPTIMIZED with Global Semaphore"""
+    @staticmethod
+    def _cache_key(keywords: Optional[List[str]]) -> Tuple[str, ...]:
+        """Normallashtirilgan kalit so'zlar to'plami (tartib va registrga bog'liq emas)"""
+        return tuple(sorted({k.strip().lower() for k in (keywords or []) if k and k.strip()}))
+
+    async def scrape_uzjobs(self, keywords: List[str] = None, deadline: Optional[float] = None) -> Optional[List[Dict]]:
+        """uzjobs.com dan vakansiyalarni yig'ish (kesh -> so'rov)
+
+        - yangi kesh - darhol qaytariladi;
+        - eskirgan (stale) kesh - darhol qaytariladi, fonda yangilanadi;
+        - kesh yo'q - bitta umumiy so'rov (single-flight) kutiladi.
+
+        deadline - chaqiruvchi kutishga tayyor bo'lgan maksimal vaqt (soniya).
+        Muddat tugasa None qaytariladi, so'rov esa fonda davom etib keshni to'ldiradi.
+        None - sayt javob bermadi (circuit ochiq, xatolik, muddat), [] - haqiqatan topilmadi.
+        """
+        key = self._cache_key(keywords)
+        entry = self._result_cache.get(key)
+        if entry is not None:
+            stored_at, results = entry
+            age = time.monotonic() - stored_at
+            if age <= self.cache_ttl:
+                self.cache_stats['hits'] += 1
+                self._result_cache.move_to_end(key)
+                return list(results)
+            if age <= self.cache_stale_ttl:
+                self.cache_stats['stale'] += 1
+                self._result_cache.move_to_end(key)
+                self._refresh(key, keywords)
+                return list(results)
+            del self._result_cache[key]
+
+        self.cache_stats['misses'] += 1
+        task = self._refresh(key, keywords)
+        try:
+            # shield: chaqiruvchi kutishni to'xtatsa ham so'rov kesh uchun davom etadi
+            if deadline is None:
+                results = await asyncio.shield(task)
+            else:
+                results = await asyncio.wait_for(asyncio.shield(task), timeout=deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"UzJobs {deadline:.1f}s deadline ichida javob bermadi")
+            return None
+        return list(results) if results is not None else None
+
+    def _refresh(self, key: Tuple[str, ...], keywords: Optional[List[str]]) -> asyncio.Task:
+        """Kalit bo'yicha yagona fon so'rovi (allaqachon ketayotgan bo'lsa - o'sha)"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.cache_stats['coalesced'] += 1
+            return task
+
+        task = asyncio.create_task(self._fetch(keywords))
+        self._inflight[key] = task
+
+        def _done(t: asyncio.Task, key=key):
+            self._inflight.pop(key, None)
+            if not t.cancelled() and t.exception() is None and t.result() is not None:
+                self._cache_put(key, t.result())
+
+        task.add_done_callback(_done)
+        return task
+
+    def _cache_put(self, key: Tuple[str, ...], results: List[Dict]):
+        self._result_cache[key] = (time.monotonic(), results)
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self.cache_max_entries:
+            self._result_cache.popitem(last=False)
+
+    async def _fetch(self, keywords: Optional[List[str]]) -> Optional[List[Dict]]:
+        """Circuit breaker va fon deadline i bilan haqiqiy so'rov (xatolikda None)"""
+        if not self.breaker.allow_request():
+            logger.info("UzJobs circuit ochiq - so'rov o'tkazib yuborildi")
+            return None
+        try:
+            return await self._scrape(keywords, time.monotonic() + UZJOBS_BACKGROUND_DEADLINE)
+        finally:
+            # Success/failure qayd etilmay chiqilgan (bekor qilingan) probe keyingisini to'smasin
+            self.breaker.release_probe()
+
+    async def _scrape(self, keywords: Optional[List[str]], expires_at: Optional[float]) -> Optional[List[Dict]]:
+        """Global semaphore ostida retry bilan so'rov (muvaffaqiyatsiz bo'lsa None - keshlanmaydi)"""
         async with self.semaphore:
-            vacancies = []
             search_query = '+'.join(keywords) if keywords else ''
             
             # Qidiruv sahifasi
@@ -34,39 +135,48 @@ class UzJobsScraper:
             delay = 10   # Increased initial delay (UzJobs is sensitive)
     
             for attempt in range(retries):
+                # Navbatda kutgan paytda circuit ochilgan bo'lishi mumkin
+                if attempt > 0 and not self.breaker.allow_request():
+                    logger.info("UzJobs circuit ochiq - retrylar to'xtatildi")
+                    return None
+
                 try:
-                    async with aiohttp.ClientSession(headers=self.headers) as session:
-                        async with session.get(url, params=params, timeout=30) as response:
-                            if response.status == 200:
-                                html = await response.text()
-                                soup = BeautifulSoup(html, 'lxml')
-                                
-                                # Vakansiya bloklarini topish
-                                items = soup.select('.vacancy-box')
-                                if not items:
-                                    items = soup.find_all('div', class_='vacancy-item')
-                                
-                                for item in items:
-                                    vacancy = self.parse_item(item)
-                                    if vacancy:
-                                        vacancies.append(vacancy)
-                                
-                                return vacancies
-    
-                            elif response.status == 429:
-                                logger.warning(f"UzJobs 429 (Too Many Requests). Retrying in {delay}s...")
-                                await asyncio.sleep(delay)
-                                delay *= 3.0  # Even stronger exponential backoff
-                            else:
-                                logger.error(f"UzJobs error: {response.status}")
-                                return []
+                    session = await http_client.get_session()
+                    async with session.get(url, params=params, headers=self.headers, timeout=30) as response:
+                        if response.status == 200:
+                            html = await response.text()
+                            self.breaker.record_success()
+                            
+                            # BeautifulSoup parse - event loopdan tashqarida
+                            try:
+                                return await run_parser(parse_uzjobs_html, html)
+                            except Exception as e:
+                                # Sahifa keldi, parser yiqildi - qayta so'rov yordam bermaydi
+                                logger.error(f"UzJobs parse xatolik: {e}", exc_info=True)
+                                return None
+
+                        elif response.status == 429:
+                            self.breaker.record_failure()
+                            logger.warning(f"UzJobs 429 (Too Many Requests). Retrying in {delay}s...")
+                            backoff = 3.0  # Even stronger exponential backoff
+                        else:
+                            self.breaker.record_failure()
+                            logger.error(f"UzJobs error: {response.status}")
+                            return None
                                 
                 except Exception as e:
+                    self.breaker.record_failure()
                     logger.error(f"UzJobs scraper error (attempt {attempt+1}): {e}")
-                    await asyncio.sleep(delay)
-                    delay *= 2.0
+                    backoff = 2.0
+
+                # Keyingi urinish deadline dan oshib ketsa - kutib o'tirmaymiz
+                if expires_at is not None and time.monotonic() + delay >= expires_at:
+                    return None
+
+                await asyncio.sleep(delay)
+                delay *= backoff
                 
-            return vacancies
+            return None
 
     def parse_item(self, item) -> Optional[Dict]:
         """Bir dona vakansiya itemini parse qilish"""
@@ -109,3 +219,20 @@ class UzJobsScraper:
             return None
 
 uz_jobs_scraper = UzJobsScraper()
+
+
+def parse_uzjobs_html(html: str) -> List[Dict]:
+    """Qidiruv sahifasi HTML idan vakansiyalarni ajratish (parsing pool uchun)"""
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # Vakansiya bloklarini topish
+    items = soup.select('.vacancy-box')
+    if not items:
+        items = soup.find_all('div', class_='vacancy-item')
+    
+    vacancies = []
+    for item in items:
+        vacancy = uz_jobs_scraper.parse_item(item)
+        if vacancy:
+            vacancies.append(vacancy)
+    return vacancies
@@ -0,0 +1,400 @@
+"""
+Vakansiya manbalari registri va orkestrator
+
+Har bir manba (hh.uz, UzJobs, Telegram, user_post) bitta umumiy interfeysni
+amalga oshiradi:
+- search(query, deadline) - user qidiruvi (kalit so'zlar bo'yicha);
+- crawl(since) - fon yig'ish (yangi vakansiyalarni bazaga saqlash).
+
+Orkestrator manbalarga parallel murojaat qiladi, har biriga alohida timeout
+qo'yadi, muddati o'tganlarini bekor qiladi va natijalarni hisobga oladi -
+eng sekin manba umumiy kechikishni belgilamaydi. Yangi manba qo'shish uchun
+bitta klass yozib, `vacancy_sources.register(...)` qilish kifoya.
+
+query - oddiy dict:
+    keywords, locations, pages, interactive, text (tayyor hh.uz so'rovi)
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+
+def query_key(keywords: Iterable[str], locations: Iterable[str]) -> str:
+    """Qidiruvning normallashtirilgan kaliti (freshness va kesh uchun)"""
+    kws = sorted({k.strip().lower() for k in keywords or [] if k and k.strip()})
+    locs = sorted({l.strip().lower() for l in locations or [] if l and l.strip()}) or ['tashkent']
+    return f"{'+'.join(kws)}|{'+'.join(locs)}"[:255]
+
+
+def freshness_key(source: str, key: str) -> str:
+    """Manba bo'yicha qidiruv freshness kaliti ('*' - manbaning butun bozori, crawl)"""
+    return f"{source}:{key}"[:255]
+
+
+class VacancySource(ABC):
+    """Manba interfeysi (search majburiy, crawl/describe - ixtiyoriy)"""
+
+    name = ''
+    title_key = ''   # i18n kaliti (natijalar xabarida)
+    emoji = '🌐'
+    timeout = 10.0   # search uchun standart muddat (soniya)
+    premium_only = False
+    always_on = False  # user sozlamasidan qat'i nazar qidiriladi
+    upstream = True    # tashqi manba (False - qidiruv bazadan o'qiydi)
+
+    @abstractmethod
+    async def search(self, query: Dict, deadline: float) -> Optional[List[Dict]]:
+        """Kalit so'zlar bo'yicha qidirish (tashqi manba javob bermasa - None, [] emas)"""
+
+    async def crawl(self, since: Optional[datetime] = None) -> List[Dict]:
+        """Fon yig'ish - bazaga saqlab, tarqatiladigan (yangi / o'zgargan) vakansiyalarni qaytaradi"""
+        return []
+
+    def describe(self, vacancies: List[Dict]) -> Dict:
+        """Natijalar xabari uchun qo'shimcha ma'lumot"""
+        return {}
+
+
+class UserPostSource(VacancySource):
+    """Bot orqali joylangan vakansiyalar (baza)"""
+
+    name = 'user_post'
+    title_key = 'source_user_post'
+    emoji = '📢'
+    timeout = 5.0
+    upstream = False
+    always_on = True
+
+    async def search(self, query: Dict, deadline: float) -> List[Dict]:
+        # Eng yangi e'lonlar - kalit so'z / joylashuv filtri chaqiruvchida (vacancy_filter).
+        # FTS bilan oldindan toraytirish erkin matnli e'lonlarda mosini yo'qotadi
+        return await db.search_vacancies(
+            [],
+            since=datetime.now(timezone.utc) - timedelta(days=30),
+            limit=50,
+            sources=['user_post'],
+        )
+
+
+class HhSource(VacancySource):
+    """hh.uz API"""
+
+    name = 'hh_uz'
+    title_key = 'source_hh_uz'
+    emoji = '🌐'
+    timeout = 20.0
+
+    async def search(self, query: Dict, deadline: float) -> Optional[List[Dict]]:
+        from scraper_api import scraper_api
+        return await scraper_api.scrape_hh_uz(
+            keywords=query.get('keywords'),
+            locations=query.get('locations') or ['Tashkent'],
+            pages=query.get('pages', 2),
+            interactive=query.get('interactive', True),
+            query=query.get('text')
+        )
+
+    async def crawl(self, since: Optional[datetime] = None) -> List[Dict]:
+        """Har bir hududdan watermarkdan keyingi yangi vakansiyalar
+
+        Vakansiyalar bir marta saqlanadi; faqat yangi yoki o'zgarganlari
+        qaytariladi. `since` - watermark hali yo'q hududlar uchun boshlanish.
+        """
+        from scraper_api import scraper_api
+        from config import HH_CRAWL_BACKFILL_HOURS, HH_CRAWL_OVERLAP_MINUTES
+
+        watermarks = await db.get_crawl_watermarks(self.name)
+        now = datetime.now(timezone.utc)
+        overlap = timedelta(minutes=HH_CRAWL_OVERLAP_MINUTES)
+        backfill_from = since or now - timedelta(hours=HH_CRAWL_BACKFILL_HOURS)
+
+        async def crawl_area(area_id: str) -> Tuple[List[Dict], bool]:
+            try:
+                last_seen = watermarks.get(area_id)
+                date_from = last_seen - overlap if last_seen else backfill_from
+
+                vacancies, newest, complete = await scraper_api.crawl_area(area_id, date_from)
+
+                ingested = await db.ingest_vacancies(vacancies)
+                new_vacancies = ingested['new'] + ingested['changed']
+
+                # To'liq o'qilmagan (yoki saqlanmagan) oynada watermark joyida qoladi -
+                # keyingi crawl o'tkazib yuborilgan eski vakansiyalarni qayta oladi
+                complete = complete and not ingested['failed']
+                if newest and complete:
+                    await db.save_crawl_watermark(self.name, area_id, newest)
+                return new_vacancies, complete
+            except Exception as e:
+                logger.error(f"hh.uz crawl xatolik (area={area_id}): {e}")
+                return [], False
+
+        area_ids = sorted(set(scraper_api.area_ids.values()))
+        results = await asyncio.gather(*[crawl_area(area_id) for area_id in area_ids])
+        new_vacancies = [v for area_vacancies, _ in results for v in area_vacancies]
+
+        # Barcha hududlar to'liq yangilandi - bazadagi hh.uz ma'lumoti har qanday qidiruv uchun yangi
+        # (boshqa manbalar - UzJobs va h.k. - o'z freshnessiga qarab yangilanadi)
+        if all(complete for _, complete in results):
+            await db.save_crawl_watermark('search', freshness_key(self.name, '*'), now)
+
+        logger.info(f"🗺 hh.uz crawl: {len(area_ids)} hudud, {len(new_vacancies)} ta yangi vakansiya")
+        return new_vacancies
+
+
+class UzJobsSource(VacancySource):
+    """uzjobs.com (scraper keshi orqali)"""
+
+    name = 'uzjobs'
+    title_key = 'source_uzjobs'
+    emoji = '🌐'
+    always_on = True
+
+    def __init__(self):
+        from config import UZJOBS_INTERACTIVE_DEADLINE
+        self.timeout = UZJOBS_INTERACTIVE_DEADLINE
+
+    async def search(self, query: Dict, deadline: float) -> Optional[List[Dict]]:
+        from uzjobs_scraper import uz_jobs_scraper
+        # Muddat tugasa ham so'rov fonda davom etib scraper keshini to'ldiradi
+        return await uz_jobs_scraper.scrape_uzjobs(query.get('keywords'), deadline=deadline)
+
+
+class TelegramSource(VacancySource):
+    """Telegram kanallari (qidiruv - bazadan, crawl - kanallardan)"""
+
+    name = 'telegram'
+    title_key = 'source_telegram'
+    emoji = '📱'
+    timeout = 5.0
+    upstream = False
+    premium_only = True
+
+    async def search(self, query: Dict, deadline: float) -> List[Dict]:
+        # Eng yangi e'lonlar - kalit so'z / joylashuv filtri chaqiruvchida (vacancy_filter).
+        # FTS bilan oldindan toraytirish erkin matnli e'lonlarda mosini yo'qotadi
+        return await db.search_vacancies(
+            [],
+            since=datetime.now(timezone.utc) - timedelta(days=7),
+            limit=300,
+            sources=['telegram'],
+        )
+
+    def describe(self, vacancies: List[Dict]) -> Dict:
+        # Kanallar bo'yicha soni (tg_@channel_id format)
+        channels = {}
+        for vac in vacancies:
+            external_id = vac.get('external_id') or ''
+            if external_id.startswith('tg_'):
+                parts = external_id.split('_')
+                if len(parts) >= 2:
+                    channels[parts[1]] = channels.get(parts[1], 0) + 1
+        return {'channels': channels}
+
+    async def crawl(self, since: Optional[datetime] = None) -> List[Dict]:
+        """Faqat oxirgi ko'rilgan xabardan keyingilarini olish (kanal watermarklari)"""
+        from config import (
+            TELEGRAM_ENABLED, TELEGRAM_BACKFILL_LIMIT,
+            TELEGRAM_MAX_NEW_PER_CHANNEL, TELEGRAM_SCRAPE_CONCURRENCY
+        )
+        if not TELEGRAM_ENABLED:
+            return []
+
+        from telegram_scraper import telegram_scraper
+        if not (telegram_scraper and telegram_scraper.is_available()):
+            return []
+
+        logger.info("📱 Telegram scraping boshlanmoqda...")
+        watermarks = await db.get_channel_watermarks()
+        # Client butun jarayon davomida ochiq turadi - faqat tirikligini tekshiramiz
+        await telegram_scraper.ensure_connected()
+        vacancies = await telegram_scraper.scrape_channels(
+            limit_per_channel=TELEGRAM_BACKFILL_LIMIT,
+            watermarks=watermarks,
+            max_new_per_channel=TELEGRAM_MAX_NEW_PER_CHANNEL,
+            concurrency=TELEGRAM_SCRAPE_CONCURRENCY
+        )
+
+        fresh = []
+        failed = []
+        if vacancies:
+            ingested = await db.ingest_vacancies(vacancies)
+            fresh = ingested['new'] + ingested['changed']
+            failed = ingested['failed']
+            logger.info(
+                f"✅ Telegram: {len(vacancies)} ta vakansiya saqlandi "
+                f"(yangi: {len(ingested['new'])}, o'zgargan: {len(ingested['changed'])}, "
+                f"xato: {len(failed)})"
+            )
+
+        # Watermark faqat saqlangan xabarlargacha siljiydi - saqlanmaganlari keyingi siklda qayta o'qiladi
+        await db.save_channel_watermarks(telegram_scraper.commit_watermarks(failed))
+        return fresh
+
+
+class SourceRegistry:
+    """Manbalar registri va parallel orkestrator"""
+
+    def __init__(self):
+        self.sources: Dict[str, VacancySource] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def register(self, source: VacancySource):
+        self.sources[source.name] = source
+        self.stats[source.name] = {
+            'calls': 0, 'ok': 0, 'empty': 0, 'timeouts': 0, 'errors': 0, 'total_time': 0.0
+        }
+
+    def get(self, name: str) -> Optional[VacancySource]:
+        return self.sources.get(name)
+
+    def select(self, requested: Iterable[str], is_premium: bool = False) -> List[str]:
+        """User sozlamasi va tarifiga ko'ra qidiriladigan manbalar"""
+        requested = set(requested or [])
+        names = []
+        for name, source in self.sources.items():
+            if source.premium_only and not is_premium:
+                continue
+            if source.always_on or name in requested or (source.premium_only and is_premium):
+                names.append(name)
+        return names
+
+    def _record(self, name: str, status: str, elapsed: float):
+        stats = self.stats[name]
+        stats['calls'] += 1
+        stats[status] += 1
+        stats['total_time'] += elapsed
+
+    async def _run_search(self, source: VacancySource, query: Dict, deadline: float) -> Dict:
+        # Manba timeouti faqat interaktiv qidiruvda; fon so'rovlari umumiy muddat bilan cheklanadi
+        timeout = min(source.timeout, deadline) if query.get('interactive', True) else deadline
+        started = time.monotonic()
+        vacancies = []
+        try:
+            found = await asyncio.wait_for(source.search(query, timeout), timeout=timeout)
+            if found is None:
+                # Tashqi manba javob bermadi (rate limit, circuit ochiq, muddat) - "bo'sh" emas
+                status = 'errors'
+                logger.warning(f"[SOURCES] {source.name}: manba javob bermadi")
+            else:
+                vacancies = found
+                status = 'ok' if vacancies else 'empty'
+        except asyncio.TimeoutError:
+            status = 'timeouts'
+            logger.warning(f"[SOURCES] {source.name}: {timeout:.1f}s ichida javob bermadi")
+        except Exception as e:
+            status = 'errors'
+            logger.error(f"[SOURCES] {source.name} xatolik: {e}")
+
+        elapsed = time.monotonic() - started
+        self._record(source.name, status, elapsed)
+        logger.info(f"[SOURCES] {source.name}: {len(vacancies)} ta, {elapsed:.2f}s ({status})")
+        return {
+            'source': source.name,
+            'status': status,
+            'elapsed': elapsed,
+            'vacancies': vacancies,
+            'meta': source.describe(vacancies) if vacancies else {},
+        }
+
+    async def search_iter(self, query: Dict, names: Iterable[str], deadline: float) -> AsyncIterator[Dict]:
+        """Manbalarga parallel so'rov - natijalar tayyor bo'lish tartibida qaytariladi"""
+        tasks = [
+            asyncio.create_task(self._run_search(self.sources[name], query, deadline))
+            for name in names if name in self.sources
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Chaqiruvchi erta to'xtasa - qolgan so'rovlarni bekor qilish
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def search(self, query: Dict, names: Iterable[str], deadline: float) -> List[Dict]:
+        """Barcha tanlangan manbalar natijalari (har biri o'z timeouti bilan, `names` tartibida)"""
+        names = list(names)
+        results = [result async for result in self.search_iter(query, names, deadline)]
+        return sorted(results, key=lambda result: names.index(result['source']))
+
+    def refresh(self, query: Dict, names: Iterable[str], key: str, deadline: float = 60.0) -> asyncio.Task:
+        """Qidiruvni fonda tashqi manbalardan yangilash (bir kalit - bitta yangilash)"""
+        task = self._refreshing.get(key)
+        if task is not None and not task.done():
+            return task
+
+        names = [name for name in names if name in self.sources and self.sources[name].upstream]
+
+        async def run():
+            try:
+                results = await self.search(dict(query, interactive=False), names, deadline)
+                await self.store(key, results)
+            except Exception as e:
+                logger.error(f"[SOURCES] Fon yangilash xatolik ({key}): {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        task = asyncio.create_task(run())
+        self._refreshing[key] = task
+        return task
+
+    async def stale_sources(self, key: str, names: Iterable[str], max_age: timedelta) -> List[str]:
+        """Qidiruv kaliti bo'yicha `max_age` dan eski (yoki hech yangilanmagan) tashqi manbalar"""
+        names = [name for name in names if name in self.sources and self.sources[name].upstream]
+        freshness = await db.get_search_freshness(
+            [freshness_key(name, k) for name in names for k in (key, '*')]
+        )
+        now = datetime.now(timezone.utc)
+        stale = []
+        for name in names:
+            refreshed = [freshness.get(freshness_key(name, k)) for k in (key, '*')]
+            refreshed = max((r for r in refreshed if r), default=None)
+            if refreshed is None or now - refreshed > max_age:
+                stale.append(name)
+        return stale
+
+    async def store(self, key: str, results: List[Dict]):
+        """Tashqi manbalar natijalarini bazaga saqlash va javob bergan manbalarni yangi deb belgilash"""
+        results = [r for r in results if r['source'] in self.sources and self.sources[r['source']].upstream]
+        vacancies = [v for result in results for v in result['vacancies']]
+        if vacancies:
+            await db.add_vacancies_bulk(vacancies)
+        refreshed_at = datetime.now(timezone.utc)
+        for result in results:
+            if result['status'] in ('ok', 'empty'):
+                await db.save_crawl_watermark('search', freshness_key(result['source'], key), refreshed_at)
+        logger.info(f"[SOURCES] {key}: {len(vacancies)} ta vakansiya bazaga saqlandi")
+
+    async def crawl(self, names: Iterable[str], since: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+        """Tanlangan manbalarni parallel crawl qilish"""
+        names = [name for name in names if name in self.sources]
+
+        async def run(name: str) -> List[Dict]:
+            started = time.monotonic()
+            try:
+                vacancies = await self.sources[name].crawl(since)
+                self._record(name, 'ok' if vacancies else 'empty', time.monotonic() - started)
+                return vacancies
+            except Exception as e:
+                self._record(name, 'errors', time.monotonic() - started)
+                logger.error(f"❌ {name} crawl xatolik: {e}")
+                return []
+
+        results = await asyncio.gather(*[run(name) for name in names])
+        return dict(zip(names, results))
+
+
+vacancy_sources = SourceRegistry()
+vacancy_sources.register(UserPostSource())
+vacancy_sources.register(HhSource())
+vacancy_sources.register(TelegramSource())
+vacancy_sources.register(UzJobsSource())